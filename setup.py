@@ -40,6 +40,7 @@ setup(
         "matplotlib>=3.7.0",
         "plotly>=5.17.0",
         "pandas>=2.0.0",
+        "pyarrow>=14.0.0",
         "PyYAML>=6.0",
         "click>=8.1.0",
         "rich>=13.5.0",
@@ -51,6 +52,7 @@ setup(
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
             "pytest-asyncio>=0.21.0",
+            "pytest-xdist>=3.3.0",
             "flake8",
             "black",
         ],
@@ -60,6 +62,9 @@ setup(
             "sphinx-autodoc-typehints>=1.24.0",
             "myst-parser>=2.0.0",
         ],
+        "speedups": [
+            "orjson>=3.9.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -5,11 +5,14 @@ Cette sonde collecte des métriques réseau et système et les expose
 via Prometheus pour le monitoring en temps réel.
 """
 
+import asyncio
+import signal
 import time
 import threading
 import socket
 import json
-from typing import Dict, Optional
+from collections import deque
+from typing import Dict, List, Optional, Tuple
 from prometheus_client import start_http_server, Gauge, Counter, Histogram
 import psutil
 from loguru import logger
@@ -38,6 +41,11 @@ class NetworkProbe:
         self.port = port
         self.running = False
         self.thread: Optional[threading.Thread] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._collect_task: Optional[asyncio.Task] = None
+        self._async_sock: Optional[socket.socket] = None
+        self._probe_sock: Optional[socket.socket] = None
+        self._probe_lock = threading.Lock()
         
         # Métriques Prometheus
         self.latency_gauge = Gauge(
@@ -88,11 +96,39 @@ class NetworkProbe:
             ["hostname"]
         )
         
+        # Enfants labellisés résolus une seule fois (évite labels() à chaque collecte)
+        self._cpu_child = self.cpu_usage_gauge.labels(hostname=hostname)
+        self._mem_child = self.memory_usage_gauge.labels(hostname=hostname)
+        self._sent_child = self.network_io_counter.labels(hostname=hostname, direction="sent")
+        self._recv_child = self.network_io_counter.labels(hostname=hostname, direction="received")
+        self._throughput_sent = self.throughput_gauge.labels(hostname=hostname, direction="sent")
+        self._throughput_recv = self.throughput_gauge.labels(hostname=hostname, direction="received")
+        self._jitter_child = self.jitter_gauge.labels(hostname=hostname)
+        self._loss_child = self.packet_loss_gauge.labels(hostname=hostname)
+        self._reconn_child = self.reconnection_counter.labels(hostname=hostname)
+        self._latency_children: Dict[str, Gauge] = {}
+        
+        # Amorcer la mesure CPU : les appels suivants renvoient l'utilisation
+        # depuis l'appel précédent sans bloquer
+        psutil.cpu_percent(interval=None)
+        
+        # Dernières valeurs lues pour incrémenter les compteurs par delta
+        self._last_bytes_sent = 0
+        self._last_bytes_recv = 0
+        self._last_net_ts: Optional[float] = None
+        
+        # Préfixe JSON constant du message de test (seul le timestamp varie)
+        self._msg_prefix = (
+            f'{{"hostname": {json.dumps(hostname)}, "type": "test_message", "timestamp": '
+        ).encode()
+        
         # Données internes
         self.last_packet_time = {}
         self.packet_times = []
-        self.latency_samples = []
-        self.test_targets = []
+        self.latency_samples = deque(maxlen=100)
+        self._prev_latency: Optional[float] = None
+        # Cibles sondées à chaque cycle de collecte : couples (IP, port)
+        self.test_targets: List[Tuple[str, int]] = []
     
     def start(self):
         """Démarre la sonde et le serveur HTTP Prometheus."""
@@ -101,23 +137,56 @@ class NetworkProbe:
             return
         
         self.running = True
+        self._open_probe_socket()
         
         # Démarrer le serveur Prometheus
         start_http_server(self.port)
         logger.info(f"Sonde démarrée sur le port {self.port} pour {self.hostname}")
         
-        # Démarrer le thread de collecte
-        self.thread = threading.Thread(target=self._collect_metrics_loop, daemon=True)
+        # Démarrer la boucle asyncio de collecte : un seul thread multiplexe
+        # les métriques et l'ensemble des cibles sondées
+        self.loop = asyncio.new_event_loop()
+        self._collect_task = self.loop.create_task(self._collect_loop())
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
     
     def stop(self):
         """Arrête la sonde."""
         self.running = False
+        loop = self.loop
+        if self._collect_task is not None and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._collect_task.cancel)
+        self._collect_task = None
         if self.thread:
             self.thread.join(timeout=2)
+        with self._probe_lock:
+            if self._probe_sock:
+                self._probe_sock.close()
+                self._probe_sock = None
         logger.info(f"Sonde arrêtée pour {self.hostname}")
     
-    def _collect_metrics_loop(self):
+    def _open_probe_socket(self) -> socket.socket:
+        """Crée (une seule fois) le socket UDP réutilisé par send_test_message."""
+        if self._probe_sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.settimeout(1.0)
+            self._probe_sock = sock
+        return self._probe_sock
+    
+    def _run_loop(self):
+        """Exécute la boucle asyncio de la sonde jusqu'à l'arrêt de la collecte."""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._collect_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._async_sock:
+                self._async_sock.close()
+                self._async_sock = None
+            self.loop.close()
+    
+    async def _collect_loop(self):
         """Boucle principale de collecte des métriques."""
         while self.running:
             try:
@@ -127,23 +196,26 @@ class NetworkProbe:
                 # Collecter les métriques réseau
                 self._collect_network_metrics()
                 
-                # Attendre avant la prochaine collecte
-                time.sleep(5)  # Intervalle de 5 secondes
+                # Sonder les cibles enregistrées
+                if self.test_targets:
+                    await self._probe_targets_async(self.test_targets)
             
             except Exception as e:
                 logger.error(f"Erreur lors de la collecte des métriques: {e}")
-                time.sleep(5)
+            
+            # Attendre avant la prochaine collecte
+            await asyncio.sleep(5)  # Intervalle de 5 secondes
     
     def _collect_system_metrics(self):
         """Collecte les métriques système (CPU, mémoire)."""
         try:
-            # CPU
-            cpu_percent = psutil.cpu_percent(interval=1)
-            self.cpu_usage_gauge.labels(hostname=self.hostname).set(cpu_percent)
+            # CPU (moyenne depuis la collecte précédente, non bloquant)
+            cpu_percent = psutil.cpu_percent(interval=None)
+            self._cpu_child.set(cpu_percent)
             
             # Mémoire
             memory = psutil.virtual_memory()
-            self.memory_usage_gauge.labels(hostname=self.hostname).set(memory.percent)
+            self._mem_child.set(memory.percent)
         
         except Exception as e:
             logger.error(f"Erreur lors de la collecte des métriques système: {e}")
@@ -154,21 +226,28 @@ class NetworkProbe:
             # Statistiques réseau
             net_io = psutil.net_io_counters()
             
-            # Mettre à jour les compteurs
-            self.network_io_counter.labels(
-                hostname=self.hostname,
-                direction="sent"
-            )._value._value = net_io.bytes_sent
+            now = time.monotonic()
             
-            self.network_io_counter.labels(
-                hostname=self.hostname,
-                direction="received"
-            )._value._value = net_io.bytes_recv
+            # Écarts depuis la collecte précédente (une remise à zéro des
+            # compteurs système, ex. redémarrage d'interface, donne un écart nul)
+            delta_sent = max(net_io.bytes_sent - self._last_bytes_sent, 0)
+            delta_recv = max(net_io.bytes_recv - self._last_bytes_recv, 0)
             
-            # Calculer le débit (approximatif)
-            # Note: Pour une mesure précise, il faudrait comparer avec les valeurs précédentes
-            # Ici on utilise une approximation basée sur les statistiques système
+            # Mettre à jour les compteurs (un Counter ne peut qu'être incrémenté)
+            self._sent_child.inc(delta_sent)
+            self._recv_child.inc(delta_recv)
             
+            # Calculer le débit à partir des écarts et du temps écoulé
+            if self._last_net_ts is not None:
+                elapsed = now - self._last_net_ts
+                if elapsed > 0:
+                    self._throughput_sent.set(delta_sent * 8 / elapsed / 1e6)
+                    self._throughput_recv.set(delta_recv * 8 / elapsed / 1e6)
+            
+            self._last_bytes_sent = net_io.bytes_sent
+            self._last_bytes_recv = net_io.bytes_recv
+            self._last_net_ts = now
+        
         except Exception as e:
             logger.error(f"Erreur lors de la collecte des métriques réseau: {e}")
     
@@ -180,20 +259,23 @@ class NetworkProbe:
             target: Cible de la mesure
             latency_ms: Latence en millisecondes
         """
-        self.latency_gauge.labels(
-            hostname=self.hostname,
-            target=target
-        ).set(latency_ms)
-        
-        # Garder un historique pour le calcul du jitter
-        self.latency_samples.append((time.time(), latency_ms))
-        if len(self.latency_samples) > 100:
-            self.latency_samples.pop(0)
-        
-        # Calculer le jitter
-        if len(self.latency_samples) > 1:
-            jitter = abs(self.latency_samples[-1][1] - self.latency_samples[-2][1])
-            self.jitter_gauge.labels(hostname=self.hostname).set(jitter)
+        child = self._latency_children.get(target)
+        if child is None:
+            child = self._latency_children[target] = self.latency_gauge.labels(
+                hostname=self.hostname,
+                target=target
+            )
+        child.set(latency_ms)
+        
+        # Garder un historique borné (la deque évince le plus ancien en O(1)),
+        # horodaté en temps monotone (ns)
+        self.latency_samples.append((time.monotonic_ns(), latency_ms))
+        
+        # Calculer le jitter à partir de la mesure précédente
+        if self._prev_latency is not None:
+            jitter = abs(latency_ms - self._prev_latency)
+            self._jitter_child.set(jitter)
+        self._prev_latency = latency_ms
     
     def record_packet_loss(self, loss_percent: float):
         """
@@ -202,7 +284,7 @@ class NetworkProbe:
         Args:
             loss_percent: Perte de paquets en pourcentage
         """
-        self.packet_loss_gauge.labels(hostname=self.hostname).set(loss_percent)
+        self._loss_child.set(loss_percent)
     
     def record_throughput(self, direction: str, throughput_mbps: float):
         """
@@ -219,7 +301,7 @@ class NetworkProbe:
     
     def record_reconnection(self):
         """Enregistre une reconnexion."""
-        self.reconnection_counter.labels(hostname=self.hostname).inc()
+        self._reconn_child.inc()
     
     def send_test_message(self, target_ip: str, target_port: int = 5004):
         """
@@ -230,36 +312,145 @@ class NetworkProbe:
             target_port: Port de la cible
         """
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(1.0)
-            
-            # Créer un message avec timestamp
-            message = {
-                "hostname": self.hostname,
-                "timestamp": time.time(),
-                "type": "test_message"
-            }
-            
-            data = json.dumps(message).encode()
-            start_time = time.time()
-            
-            sock.sendto(data, (target_ip, target_port))
-            
-            # Essayer de recevoir une réponse
-            try:
-                response, _ = sock.recvfrom(1024)
-                response_time = time.time()
-                latency_ms = (response_time - start_time) * 1000
+            # Le socket est partagé : un seul échange requête/réponse à la fois
+            with self._probe_lock:
+                sock = self._open_probe_socket()
                 
-                self.record_latency(target_ip, latency_ms)
-            
-            except socket.timeout:
-                logger.warning(f"Timeout lors de l'envoi du message de test à {target_ip}")
-            
-            sock.close()
+                # Créer un message avec timestamp
+                data = self._msg_prefix + repr(time.time()).encode() + b"}"
+                start_time = time.time()
+                
+                sock.sendto(data, (target_ip, target_port))
+                
+                # Essayer de recevoir une réponse
+                try:
+                    response, _ = sock.recvfrom(1024)
+                    response_time = time.time()
+                    latency_ms = (response_time - start_time) * 1000
+                    
+                    self.record_latency(target_ip, latency_ms)
+                
+                except socket.timeout:
+                    logger.warning(f"Timeout lors de l'envoi du message de test à {target_ip}")
         
         except Exception as e:
             logger.error(f"Erreur lors de l'envoi du message de test: {e}")
+    
+    def probe_batch(self, targets: List[Tuple[str, int]], timeout: float = 1.0) -> Dict[str, float]:
+        """
+        Envoie un message de test à plusieurs cibles en un seul cycle.
+        
+        Tous les messages sont émis d'abord, puis les réponses sont
+        collectées avec un délai global unique : N cibles coûtent un seul
+        temps d'attente au lieu de N allers-retours bloquants.
+        
+        Args:
+            targets: Liste de couples (IP, port) à sonder
+            timeout: Délai maximal d'attente des réponses en secondes
+            
+        Returns:
+            Dictionnaire IP -> latence en millisecondes des cibles ayant répondu
+        """
+        latencies: Dict[Tuple[str, int], float] = {}
+        
+        try:
+            with self._probe_lock:
+                sock = self._open_probe_socket()
+                
+                send_times: Dict[Tuple[str, int], float] = {}
+                for target_ip, target_port in targets:
+                    data = self._msg_prefix + repr(time.time()).encode() + b"}"
+                    send_times[(target_ip, target_port)] = time.monotonic()
+                    sock.sendto(data, (target_ip, target_port))
+                
+                deadline = time.monotonic() + timeout
+                try:
+                    while len(latencies) < len(send_times):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        sock.settimeout(remaining)
+                        _, addr = sock.recvfrom(1024)
+                        sent_at = send_times.get(addr)
+                        if sent_at is not None and addr not in latencies:
+                            latencies[addr] = (time.monotonic() - sent_at) * 1000
+                except socket.timeout:
+                    pass
+                finally:
+                    sock.settimeout(1.0)
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de l'envoi des messages de test: {e}")
+        
+        return self._record_batch(targets, latencies)
+    
+    async def _probe_targets_async(self, targets: List[Tuple[str, int]], timeout: float = 1.0) -> Dict[str, float]:
+        """
+        Équivalent asynchrone de probe_batch, exécuté dans la boucle de la sonde.
+        
+        Utilise un socket non bloquant propre à la boucle asyncio, sans
+        verrou ni thread supplémentaire par cible. Le socket est surveillé
+        une seule fois pour tout le cycle et chaque réveil vide toutes les
+        réponses en attente, au lieu d'un enregistrement epoll par datagramme.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_sock is None:
+            self._async_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._async_sock.setblocking(False)
+        sock = self._async_sock
+        
+        latencies: Dict[Tuple[str, int], float] = {}
+        send_times: Dict[Tuple[str, int], float] = {}
+        all_received = loop.create_future()
+        
+        def on_readable():
+            while True:
+                try:
+                    _, addr = sock.recvfrom(1024)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError as e:
+                    # Ex. ICMP port unreachable remonté sur le socket
+                    logger.debug(f"Erreur de réception ignorée: {e}")
+                    continue
+                sent_at = send_times.get(addr)
+                if sent_at is not None and addr not in latencies:
+                    latencies[addr] = (time.monotonic() - sent_at) * 1000
+            if len(latencies) == len(send_times) and not all_received.done():
+                all_received.set_result(None)
+        
+        loop.add_reader(sock.fileno(), on_readable)
+        try:
+            for target_ip, target_port in targets:
+                data = self._msg_prefix + repr(time.time()).encode() + b"}"
+                send_times[(target_ip, target_port)] = time.monotonic()
+                sock.sendto(data, (target_ip, target_port))
+            
+            # asyncio.wait plutôt que wait_for : sous Python 3.11, wait_for perd
+            # l'annulation de stop() si elle coïncide avec la dernière réponse
+            await asyncio.wait((all_received,), timeout=timeout)
+        
+        except OSError as e:
+            logger.error(f"Erreur lors de l'envoi des messages de test: {e}")
+        finally:
+            loop.remove_reader(sock.fileno())
+        
+        return self._record_batch(targets, latencies)
+    
+    def _record_batch(
+        self,
+        targets: List[Tuple[str, int]],
+        latencies: Dict[Tuple[str, int], float]
+    ) -> Dict[str, float]:
+        """Enregistre les latences d'un cycle de sondage et signale les cibles muettes."""
+        for target in targets:
+            if target not in latencies:
+                logger.warning(f"Timeout lors de l'envoi du message de test à {target[0]}")
+        
+        for (target_ip, _), latency_ms in latencies.items():
+            self.record_latency(target_ip, latency_ms)
+        
+        return {target_ip: latency_ms for (target_ip, _), latency_ms in latencies.items()}
 
 
 def main():
@@ -284,17 +475,18 @@ def main():
     
     probe = NetworkProbe(hostname=args.hostname, port=args.port)
     
-    try:
-        probe.start()
-        logger.info("Sonde démarrée. Appuyez sur Ctrl+C pour arrêter.")
-        
-        # Boucle principale
-        while True:
-            time.sleep(1)
+    # Attente passive jusqu'à SIGINT/SIGTERM, sans réveil périodique
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    
+    probe.start()
+    logger.info("Sonde démarrée. Appuyez sur Ctrl+C pour arrêter.")
+    
+    stop_event.wait()
     
-    except KeyboardInterrupt:
-        logger.info("Arrêt de la sonde...")
-        probe.stop()
+    logger.info("Arrêt de la sonde...")
+    probe.stop()
 
 
 if __name__ == "__main__":
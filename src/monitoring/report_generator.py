@@ -5,11 +5,20 @@ Ce module génère des rapports visuels avec graphiques à partir
 des résultats de tests.
 """
 
+import io
 import json
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # Rendu fichier uniquement, aucun backend graphique
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import matplotlib.dates as mdates
 from loguru import logger
 
@@ -17,187 +26,14 @@ from ..tests.run_test_campaign import TestCampaignResult
 from ..tests.iperf_wrapper import IperfResult
 from ..tests.latency_test import LatencyResult
 
+# Style des graphiques, appliqué une fois par processus (y compris dans les
+# processus de rendu, qui importent ce module)
+plt.style.use("seaborn-v0_8-darkgrid")
 
-class ReportGenerator:
-    """
-    Générateur de rapports pour les campagnes de tests.
-    
-    Cette classe génère des rapports HTML avec graphiques à partir
-    des résultats de tests de performance.
-    """
-    
-    def __init__(self):
-        """Initialise le générateur de rapports."""
-        plt.style.use("seaborn-v0_8-darkgrid")
-    
-    def generate_html_report(self, result: TestCampaignResult, output_path: Path):
-        """
-        Génère un rapport HTML avec graphiques.
-        
-        Args:
-            result: Résultat de la campagne de tests
-            output_path: Chemin de sortie pour le fichier HTML
-        """
-        logger.info(f"Génération du rapport HTML: {output_path}")
-        
-        # Générer les graphiques
-        graphs_dir = output_path.parent / "graphs"
-        graphs_dir.mkdir(exist_ok=True)
-        
-        latency_chart = self._generate_latency_chart(result.latency_results, graphs_dir, output_path)
-        throughput_chart = self._generate_throughput_chart(result.iperf_results, graphs_dir, output_path)
-        
-        # Générer le HTML
-        html_content = self._generate_html_content(result, latency_chart, throughput_chart)
-        
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-    
-    def _generate_latency_chart(self, results: List[LatencyResult], output_dir: Path, output_path: Path) -> Optional[str]:
-        """Génère un graphique de latence."""
-        if not results:
-            return None
-        
-        fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-        fig.suptitle("Analyse de Latence", fontsize=16, fontweight="bold")
-        
-        # Graphique 1: RTT moyen, min, max
-        ax1 = axes[0, 0]
-        rtt_mean = [r.rtt_mean_ms for r in results]
-        rtt_min = [r.rtt_min_ms for r in results]
-        rtt_max = [r.rtt_max_ms for r in results]
-        
-        x = range(len(results))
-        ax1.plot(x, rtt_mean, "o-", label="RTT Moyen", linewidth=2)
-        ax1.fill_between(x, rtt_min, rtt_max, alpha=0.3, label="Min-Max")
-        ax1.set_xlabel("Test")
-        ax1.set_ylabel("Latence (ms)")
-        ax1.set_title("RTT Moyen, Min, Max")
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # Graphique 2: Jitter
-        ax2 = axes[0, 1]
-        jitter = [r.jitter_ms for r in results]
-        ax2.bar(x, jitter, color="orange", alpha=0.7)
-        ax2.set_xlabel("Test")
-        ax2.set_ylabel("Jitter (ms)")
-        ax2.set_title("Jitter")
-        ax2.grid(True, alpha=0.3, axis="y")
-        
-        # Graphique 3: Perte de paquets
-        ax3 = axes[1, 0]
-        packet_loss = [r.packet_loss_percent for r in results]
-        ax3.bar(x, packet_loss, color="red", alpha=0.7)
-        ax3.set_xlabel("Test")
-        ax3.set_ylabel("Perte de paquets (%)")
-        ax3.set_title("Perte de Paquets")
-        ax3.grid(True, alpha=0.3, axis="y")
-        
-        # Graphique 4: Distribution des RTT (pour le premier test)
-        if results and results[0].rtt_samples:
-            ax4 = axes[1, 1]
-            ax4.hist(results[0].rtt_samples, bins=30, color="green", alpha=0.7, edgecolor="black")
-            ax4.set_xlabel("RTT (ms)")
-            ax4.set_ylabel("Fréquence")
-            ax4.set_title("Distribution des RTT (Test 1)")
-            ax4.grid(True, alpha=0.3, axis="y")
-        
-        plt.tight_layout()
-        
-        chart_path = output_dir / "latency_chart.png"
-        plt.savefig(chart_path, dpi=150, bbox_inches="tight")
-        plt.close()
-        
-        return str(chart_path.relative_to(output_path.parent))
-    
-    def _generate_throughput_chart(self, results: List[IperfResult], output_dir: Path, output_path: Path) -> Optional[str]:
-        """Génère un graphique de débit."""
-        if not results:
-            return None
-        
-        fig, axes = plt.subplots(2, 1, figsize=(12, 8))
-        fig.suptitle("Analyse de Débit", fontsize=16, fontweight="bold")
-        
-        # Séparer TCP et UDP
-        tcp_results = [r for r in results if r.protocol == "tcp"]
-        udp_results = [r for r in results if r.protocol == "udp"]
-        
-        # Graphique 1: Débit TCP
-        if tcp_results:
-            ax1 = axes[0]
-            throughput = [r.throughput_mbps for r in tcp_results]
-            retransmissions = [r.retransmissions or 0 for r in tcp_results]
-            
-            x = range(len(tcp_results))
-            ax1_twin = ax1.twinx()
-            
-            bars = ax1.bar(x, throughput, color="blue", alpha=0.7, label="Débit")
-            line = ax1_twin.plot(x, retransmissions, "ro-", label="Retransmissions", linewidth=2)
-            
-            ax1.set_xlabel("Test")
-            ax1.set_ylabel("Débit (Mbps)", color="blue")
-            ax1_twin.set_ylabel("Retransmissions", color="red")
-            ax1.set_title("Débit TCP et Retransmissions")
-            ax1.grid(True, alpha=0.3, axis="y")
-            
-            # Légende combinée
-            lines1, labels1 = ax1.get_legend_handles_labels()
-            lines2, labels2 = ax1_twin.get_legend_handles_labels()
-            ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
-        
-        # Graphique 2: Débit UDP
-        if udp_results:
-            ax2 = axes[1]
-            throughput = [r.throughput_mbps for r in udp_results]
-            packet_loss = [r.packet_loss or 0 for r in udp_results]
-            jitter = [r.jitter_ms or 0 for r in udp_results]
-            
-            x = range(len(udp_results))
-            ax2_twin = ax2.twinx()
-            
-            bars = ax2.bar(x, throughput, color="green", alpha=0.7, label="Débit")
-            line1 = ax2_twin.plot(x, packet_loss, "ro-", label="Perte (%)", linewidth=2)
-            line2 = ax2_twin.plot(x, jitter, "mo-", label="Jitter (ms)", linewidth=2)
-            
-            ax2.set_xlabel("Test")
-            ax2.set_ylabel("Débit (Mbps)", color="green")
-            ax2_twin.set_ylabel("Perte / Jitter", color="red")
-            ax2.set_title("Débit UDP, Perte et Jitter")
-            ax2.grid(True, alpha=0.3, axis="y")
-            
-            # Légende combinée
-            lines1, labels1 = ax2.get_legend_handles_labels()
-            lines2, labels2 = ax2_twin.get_legend_handles_labels()
-            ax2.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
-        
-        plt.tight_layout()
-        
-        chart_path = output_dir / "throughput_chart.png"
-        plt.savefig(chart_path, dpi=150, bbox_inches="tight")
-        plt.close()
-        
-        return str(chart_path.relative_to(output_path.parent))
-    
-    def _generate_html_content(
-        self,
-        result: TestCampaignResult,
-        latency_chart: Optional[str],
-        throughput_chart: Optional[str]
-    ) -> str:
-        """Génère le contenu HTML du rapport."""
-        status_icon = "✅" if result.passed else "❌"
-        status_color = "#28a745" if result.passed else "#dc3545"
-        
-        html = f"""
-<!DOCTYPE html>
-<html lang="fr">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Rapport de Campagne - {result.campaign_id}</title>
-    <style>
-        body {{
+
+# Feuille de style du rapport ; seule la couleur de statut varie, les deux
+# variantes sont donc calculées une fois à l'import
+_CSS_TEMPLATE = """        body {{
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
             margin: 0;
             padding: 20px;
@@ -213,14 +49,14 @@ class ReportGenerator:
         }}
         h1 {{
             color: #333;
-            border-bottom: 3px solid {status_color};
+            border-bottom: 3px solid {color};
             padding-bottom: 10px;
         }}
         .status {{
             display: inline-block;
             padding: 8px 16px;
             border-radius: 4px;
-            background-color: {status_color};
+            background-color: {color};
             color: white;
             font-weight: bold;
             margin: 10px 0;
@@ -294,29 +130,43 @@ class ReportGenerator:
             color: #721c24;
             margin: 5px 0;
         }}
-    </style>
+"""
+
+_CSS_PASS = _CSS_TEMPLATE.format(color="#28a745")
+_CSS_FAIL = _CSS_TEMPLATE.format(color="#dc3545")
+
+# Fragments HTML du rapport, définis une fois à l'import du module
+_HTML_HEAD = """
+<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Rapport de Campagne - {campaign_id}</title>
+    <style>
+{css}    </style>
 </head>
 <body>
     <div class="container">
         <h1>{status_icon} Rapport de Campagne de Tests</h1>
-        <div class="status">{'RÉUSSI' if result.passed else 'ÉCHOUÉ'}</div>
+        <div class="status">{status_label}</div>
         
         <div class="summary">
             <div class="summary-card">
                 <h3>Campagne ID</h3>
-                <div class="value">{result.campaign_id}</div>
+                <div class="value">{campaign_id}</div>
             </div>
             <div class="summary-card">
                 <h3>Durée</h3>
-                <div class="value">{result.duration_seconds:.2f}s</div>
+                <div class="value">{duration:.2f}s</div>
             </div>
             <div class="summary-card">
                 <h3>Tests iperf3</h3>
-                <div class="value">{len(result.iperf_results)}</div>
+                <div class="value">{iperf_count}</div>
             </div>
             <div class="summary-card">
                 <h3>Tests de latence</h3>
-                <div class="value">{len(result.latency_results)}</div>
+                <div class="value">{latency_count}</div>
             </div>
         </div>
         
@@ -328,50 +178,40 @@ class ReportGenerator:
             </tr>
             <tr>
                 <td>Date de début</td>
-                <td>{result.start_time}</td>
+                <td>{start_time}</td>
             </tr>
             <tr>
                 <td>Date de fin</td>
-                <td>{result.end_time}</td>
+                <td>{end_time}</td>
             </tr>
             <tr>
                 <td>Durée totale</td>
-                <td>{result.duration_seconds:.2f} secondes</td>
+                <td>{duration:.2f} secondes</td>
             </tr>
         </table>
 """
-        
-        if result.errors:
-            html += """
+
+_HTML_ERRORS_OPEN = """
         <div class="errors">
             <h3>Erreurs et Avertissements</h3>
             <ul>
 """
-            for error in result.errors:
-                html += f"                <li>{error}</li>\n"
-            html += """
+
+_HTML_ERROR_ITEM = "                <li>{error}</li>\n"
+
+_HTML_ERRORS_CLOSE = """
             </ul>
         </div>
 """
-        
-        if latency_chart:
-            html += f"""
-        <div class="chart">
-            <h2>Analyse de Latence</h2>
-            <img src="{latency_chart}" alt="Graphique de latence">
-        </div>
-"""
-        
-        if throughput_chart:
-            html += f"""
+
+_HTML_CHART = """
         <div class="chart">
-            <h2>Analyse de Débit</h2>
-            <img src="{throughput_chart}" alt="Graphique de débit">
+            <h2>{title}</h2>
+            <img src="{src}" alt="{alt}">
         </div>
 """
-        
-        if result.iperf_results:
-            html += """
+
+_HTML_IPERF_TABLE_OPEN = """
         <h2>Résultats iperf3</h2>
         <table>
             <tr>
@@ -383,23 +223,19 @@ class ReportGenerator:
                 <th>Jitter (ms)</th>
             </tr>
 """
-            for r in result.iperf_results:
-                html += f"""
+
+_HTML_IPERF_ROW = """
             <tr>
-                <td>{r.protocol.upper()}</td>
-                <td>{r.duration}</td>
-                <td>{r.throughput_mbps:.2f}</td>
-                <td>{r.retransmissions or 'N/A'}</td>
-                <td>{r.packet_loss or 'N/A'}</td>
-                <td>{r.jitter_ms or 'N/A'}</td>
+                <td>{protocol}</td>
+                <td>{duration}</td>
+                <td>{throughput:.2f}</td>
+                <td>{retransmissions}</td>
+                <td>{packet_loss}</td>
+                <td>{jitter}</td>
             </tr>
 """
-            html += """
-        </table>
-"""
-        
-        if result.latency_results:
-            html += """
+
+_HTML_LATENCY_TABLE_OPEN = """
         <h2>Résultats de Latence</h2>
         <table>
             <tr>
@@ -413,24 +249,25 @@ class ReportGenerator:
                 <th>Paquets reçus</th>
             </tr>
 """
-            for r in result.latency_results:
-                html += f"""
+
+_HTML_LATENCY_ROW = """
             <tr>
-                <td>{r.rtt_min_ms:.2f}</td>
-                <td>{r.rtt_max_ms:.2f}</td>
-                <td>{r.rtt_mean_ms:.2f}</td>
-                <td>{r.rtt_std_ms:.2f}</td>
-                <td>{r.jitter_ms:.2f}</td>
-                <td>{r.packet_loss_percent:.2f}</td>
-                <td>{r.packets_sent}</td>
-                <td>{r.packets_received}</td>
+                <td>{rtt_min:.2f}</td>
+                <td>{rtt_max:.2f}</td>
+                <td>{rtt_mean:.2f}</td>
+                <td>{rtt_std:.2f}</td>
+                <td>{jitter:.2f}</td>
+                <td>{packet_loss:.2f}</td>
+                <td>{packets_sent}</td>
+                <td>{packets_received}</td>
             </tr>
 """
-            html += """
+
+_HTML_TABLE_CLOSE = """
         </table>
 """
-        
-        html += """
+
+_HTML_THRESHOLDS_OPEN = """
         <h2>Seuils Configurés</h2>
         <table>
             <tr>
@@ -438,19 +275,417 @@ class ReportGenerator:
                 <th>Valeur</th>
             </tr>
 """
-        for key, value in result.thresholds.items():
-            html += f"""
+
+_HTML_THRESHOLD_ROW = """
             <tr>
                 <td>{key}</td>
                 <td>{value}</td>
             </tr>
 """
-        
-        html += """
+
+_HTML_FOOT = """
         </table>
     </div>
 </body>
 </html>
 """
+
+
+def _extract(results: list, *fields: str) -> List[np.ndarray]:
+    """
+    Extrait plusieurs champs numériques des résultats en un seul parcours.
+    
+    Args:
+        results: Liste de résultats (dataclasses)
+        *fields: Noms des attributs à extraire
+        
+    Returns:
+        Un tableau float64 par champ, dans l'ordre demandé
+    """
+    arrays = [np.empty(len(results), dtype=np.float64) for _ in fields]
+    for i, r in enumerate(results):
+        for array, field in zip(arrays, fields):
+            array[i] = getattr(r, field)
+    return arrays
+
+
+# Figure réutilisée par tous les graphiques rendus dans un même processus
+# (hors pyplot, elle n'a donc jamais besoin d'être fermée)
+_FIGURE: Optional[Figure] = None
+
+
+def _get_figure() -> Figure:
+    """Retourne la figure du processus courant, créée au premier appel."""
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = Figure()
+    return _FIGURE
+
+
+def _plot_rtt(ax, series: tuple):
+    """Panneau RTT moyen, min, max."""
+    rtt_mean, rtt_min, rtt_max = series
+    x = np.arange(len(rtt_mean))
+    ax.plot(x, rtt_mean, "o-", label="RTT Moyen", linewidth=2)
+    ax.fill_between(x, rtt_min, rtt_max, alpha=0.3, label="Min-Max")
+    ax.set_xlabel("Test")
+    ax.set_ylabel("Latence (ms)")
+    ax.set_title("RTT Moyen, Min, Max")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+
+def _plot_jitter(ax, jitter: np.ndarray):
+    """Panneau du jitter par test."""
+    ax.bar(np.arange(len(jitter)), jitter, color="orange", alpha=0.7)
+    ax.set_xlabel("Test")
+    ax.set_ylabel("Jitter (ms)")
+    ax.set_title("Jitter")
+    ax.grid(True, alpha=0.3, axis="y")
+
+
+def _plot_packet_loss(ax, packet_loss: np.ndarray):
+    """Panneau de la perte de paquets par test."""
+    ax.bar(np.arange(len(packet_loss)), packet_loss, color="red", alpha=0.7)
+    ax.set_xlabel("Test")
+    ax.set_ylabel("Perte de paquets (%)")
+    ax.set_title("Perte de Paquets")
+    ax.grid(True, alpha=0.3, axis="y")
+
+
+def _plot_rtt_distribution(ax, rtt_samples: List[float]):
+    """Panneau de distribution des RTT (pour le premier test)."""
+    # Histogramme précalculé en float32 : matplotlib ne reçoit que les 30 classes
+    counts, edges = np.histogram(np.asarray(rtt_samples, dtype=np.float32), bins=30)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge",
+           color="green", alpha=0.7, edgecolor="black")
+    ax.set_xlabel("RTT (ms)")
+    ax.set_ylabel("Fréquence")
+    ax.set_title("Distribution des RTT (Test 1)")
+    ax.grid(True, alpha=0.3, axis="y")
+
+
+def _render_latency_chart(results: List[LatencyResult], output_dir: Path) -> Optional[str]:
+    """Génère un graphique de latence (exécuté dans un processus du pool)."""
+    if not results:
+        return None
+    
+    rtt_mean, rtt_min, rtt_max, jitter, packet_loss = _extract(
+        results, "rtt_mean_ms", "rtt_min_ms", "rtt_max_ms", "jitter_ms", "packet_loss_percent"
+    )
+    
+    # Seuls les panneaux disposant de données sont tracés
+    panels = [
+        (_plot_rtt, (rtt_mean, rtt_min, rtt_max)),
+        (_plot_jitter, jitter),
+        (_plot_packet_loss, packet_loss),
+        (_plot_rtt_distribution, results[0].rtt_samples),
+    ]
+    panels = [(plot, data) for plot, data in panels if len(data)]
+    rows = math.ceil(len(panels) / 2)
+    
+    fig = _get_figure()
+    fig.clear()
+    fig.set_size_inches(12, 5 * rows)
+    axes = list(fig.subplots(rows, 2, squeeze=False).flat)
+    fig.suptitle("Analyse de Latence", fontsize=16, fontweight="bold")
+    
+    for ax, (plot, data) in zip(axes, panels):
+        plot(ax, data)
+    for ax in axes[len(panels):]:
+        ax.remove()
+    
+    fig.tight_layout()
+    
+    chart_path = output_dir / "latency_chart.png"
+    fig.savefig(chart_path, dpi=150, bbox_inches="tight")
+    
+    # Les graphiques sont toujours écrits dans graphs/, à côté du rapport
+    return f"graphs/{chart_path.name}"
+
+
+def _render_throughput_chart(results: List[IperfResult], output_dir: Path) -> Optional[str]:
+    """Génère un graphique de débit (exécuté dans un processus du pool)."""
+    if not results:
+        return None
+    
+    fig = _get_figure()
+    fig.clear()
+    fig.set_size_inches(12, 8)
+    axes = fig.subplots(2, 1)
+    fig.suptitle("Analyse de Débit", fontsize=16, fontweight="bold")
+    
+    # Séparer TCP et UDP
+    tcp_results = [r for r in results if r.protocol == "tcp"]
+    udp_results = [r for r in results if r.protocol == "udp"]
+    
+    # Graphique 1: Débit TCP
+    if tcp_results:
+        ax1 = axes[0]
+        throughput = [r.throughput_mbps for r in tcp_results]
+        retransmissions = [r.retransmissions or 0 for r in tcp_results]
+    
+        x = range(len(tcp_results))
+        ax1_twin = ax1.twinx()
+    
+        bars = ax1.bar(x, throughput, color="blue", alpha=0.7, label="Débit")
+        line = ax1_twin.plot(x, retransmissions, "ro-", label="Retransmissions", linewidth=2)
+    
+        ax1.set_xlabel("Test")
+        ax1.set_ylabel("Débit (Mbps)", color="blue")
+        ax1_twin.set_ylabel("Retransmissions", color="red")
+        ax1.set_title("Débit TCP et Retransmissions")
+        ax1.grid(True, alpha=0.3, axis="y")
+    
+        # Légende combinée
+        lines1, labels1 = ax1.get_legend_handles_labels()
+        lines2, labels2 = ax1_twin.get_legend_handles_labels()
+        ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
+    
+    # Graphique 2: Débit UDP
+    if udp_results:
+        ax2 = axes[1]
+        throughput = [r.throughput_mbps for r in udp_results]
+        packet_loss = [r.packet_loss or 0 for r in udp_results]
+        jitter = [r.jitter_ms or 0 for r in udp_results]
+    
+        x = range(len(udp_results))
+        ax2_twin = ax2.twinx()
+    
+        bars = ax2.bar(x, throughput, color="green", alpha=0.7, label="Débit")
+        line1 = ax2_twin.plot(x, packet_loss, "ro-", label="Perte (%)", linewidth=2)
+        line2 = ax2_twin.plot(x, jitter, "mo-", label="Jitter (ms)", linewidth=2)
+    
+        ax2.set_xlabel("Test")
+        ax2.set_ylabel("Débit (Mbps)", color="green")
+        ax2_twin.set_ylabel("Perte / Jitter", color="red")
+        ax2.set_title("Débit UDP, Perte et Jitter")
+        ax2.grid(True, alpha=0.3, axis="y")
+    
+        # Légende combinée
+        lines1, labels1 = ax2.get_legend_handles_labels()
+        lines2, labels2 = ax2_twin.get_legend_handles_labels()
+        ax2.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
+    
+    fig.tight_layout()
+    
+    chart_path = output_dir / "throughput_chart.png"
+    fig.savefig(chart_path, dpi=150, bbox_inches="tight")
+    
+    # Les graphiques sont toujours écrits dans graphs/, à côté du rapport
+    return f"graphs/{chart_path.name}"
+
+
+class ReportGenerator:
+    """
+    Générateur de rapports pour les campagnes de tests.
+    
+    Cette classe génère des rapports HTML avec graphiques à partir
+    des résultats de tests de performance.
+    
+    Les graphiques sont rendus par un pool de deux processus, créé au premier
+    rapport HTML et conservé pour les suivants (chaque processus réutilise sa
+    figure) : appeler ``close()``, ou utiliser le générateur comme
+    gestionnaire de contexte.
+    """
+    
+    def __init__(self):
+        """Initialise le générateur de rapports."""
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def close(self):
+        """Arrête le pool de rendu des graphiques s'il a été créé."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+    
+    def __enter__(self) -> "ReportGenerator":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Retourne le pool de rendu, créé au premier appel."""
+        if self._pool is None:
+            # spawn plutôt que fork : le processus compte déjà d'autres threads
+            # (serveurs de test, journalisation) dont un fork copierait les verrous
+            self._pool = ProcessPoolExecutor(
+                max_workers=2,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+    
+    def generate_html_report(self, result: TestCampaignResult, output_path: Path):
+        """
+        Génère un rapport HTML avec graphiques.
+        
+        Args:
+            result: Résultat de la campagne de tests
+            output_path: Chemin de sortie pour le fichier HTML
+        """
+        logger.info(f"Génération du rapport HTML: {output_path}")
+        
+        # Générer les graphiques
+        graphs_dir = output_path.parent / "graphs"
+        graphs_dir.mkdir(exist_ok=True)
+        
+        # Les deux graphiques sont rendus en parallèle dans des processus
+        # distincts (le rendu matplotlib est lié au CPU et au GIL)
+        pool = self._get_pool()
+        latency_future = pool.submit(_render_latency_chart, result.latency_results, graphs_dir)
+        throughput_future = pool.submit(_render_throughput_chart, result.iperf_results, graphs_dir)
+        latency_chart = latency_future.result()
+        throughput_chart = throughput_future.result()
+        
+        # Générer le HTML
+        html_content = self._generate_html_content(result, latency_chart, throughput_chart)
+        
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(html_content)
+    
+    def generate_parquet(self, result: TestCampaignResult, output_path: Path) -> List[Path]:
+        """
+        Exporte les résultats bruts de la campagne au format Parquet.
+        
+        Un fichier colonnaire est écrit par type de résultat
+        (``<nom>.latency.parquet`` et ``<nom>.iperf.parquet``), chaque ligne
+        portant l'identifiant de campagne pour faciliter l'agrégation de
+        plusieurs campagnes.
+        
+        Args:
+            result: Résultat de la campagne de tests
+            output_path: Chemin de base des fichiers Parquet
+            
+        Returns:
+            Liste des fichiers écrits
+        """
+        # Import différé : pyarrow n'est nécessaire que pour cet export
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        written = []
+        
+        if result.latency_results:
+            latency = result.latency_results
+            rtt_min, rtt_max, rtt_mean, rtt_std, jitter, loss, sent, received = _extract(
+                latency,
+                "rtt_min_ms", "rtt_max_ms", "rtt_mean_ms", "rtt_std_ms",
+                "jitter_ms", "packet_loss_percent", "packets_sent", "packets_received"
+            )
+            table = pa.Table.from_pydict({
+                "campaign_id": pa.array([result.campaign_id] * len(latency)).dictionary_encode(),
+                "rtt_min_ms": rtt_min,
+                "rtt_max_ms": rtt_max,
+                "rtt_mean_ms": rtt_mean,
+                "rtt_std_ms": rtt_std,
+                "jitter_ms": jitter,
+                "packet_loss_percent": loss,
+                "packets_sent": sent.astype(np.int64),
+                "packets_received": received.astype(np.int64),
+                "rtt_samples": pa.array([list(r.rtt_samples) for r in latency], type=pa.list_(pa.float64())),
+            })
+            latency_path = output_path.with_suffix(".latency.parquet")
+            pq.write_table(table, latency_path, compression="zstd")
+            written.append(latency_path)
+        
+        if result.iperf_results:
+            iperf = result.iperf_results
+            table = pa.Table.from_pydict({
+                "campaign_id": pa.array([result.campaign_id] * len(iperf)).dictionary_encode(),
+                "protocol": pa.array([r.protocol for r in iperf]).dictionary_encode(),
+                "duration": pa.array([r.duration for r in iperf], type=pa.float64()),
+                "throughput_mbps": pa.array([r.throughput_mbps for r in iperf], type=pa.float64()),
+                "retransmissions": pa.array([r.retransmissions for r in iperf], type=pa.int64()),
+                "packet_loss": pa.array([r.packet_loss for r in iperf], type=pa.float64()),
+                "jitter_ms": pa.array([r.jitter_ms for r in iperf], type=pa.float64()),
+                "bytes_sent": pa.array([r.bytes_sent for r in iperf], type=pa.int64()),
+                "bytes_received": pa.array([r.bytes_received for r in iperf], type=pa.int64()),
+            })
+            iperf_path = output_path.with_suffix(".iperf.parquet")
+            pq.write_table(table, iperf_path, compression="zstd")
+            written.append(iperf_path)
+        
+        return written
+    
+    def _generate_html_content(
+        self,
+        result: TestCampaignResult,
+        latency_chart: Optional[str],
+        throughput_chart: Optional[str]
+    ) -> str:
+        """Génère le contenu HTML du rapport."""
+        status_icon = "✅" if result.passed else "❌"
+        css = _CSS_PASS if result.passed else _CSS_FAIL
+        
+        # Les fragments sont écrits dans un tampon à croissance amortie ;
+        # toute chaîne provenant des résultats est échappée
+        buf = io.StringIO()
+        w = buf.write
+        
+        w(_HTML_HEAD.format(
+            campaign_id=escape(str(result.campaign_id)),
+            css=css,
+            status_icon=status_icon,
+            status_label="RÉUSSI" if result.passed else "ÉCHOUÉ",
+            duration=result.duration_seconds,
+            iperf_count=len(result.iperf_results),
+            latency_count=len(result.latency_results),
+            start_time=escape(str(result.start_time)),
+            end_time=escape(str(result.end_time))
+        ))
+        
+        if result.errors:
+            w(_HTML_ERRORS_OPEN)
+            for error in result.errors:
+                w(_HTML_ERROR_ITEM.format(error=escape(str(error))))
+            w(_HTML_ERRORS_CLOSE)
+        
+        if latency_chart:
+            w(_HTML_CHART.format(
+                title="Analyse de Latence",
+                src=escape(latency_chart),
+                alt="Graphique de latence"
+            ))
+        
+        if throughput_chart:
+            w(_HTML_CHART.format(
+                title="Analyse de Débit",
+                src=escape(throughput_chart),
+                alt="Graphique de débit"
+            ))
+        
+        if result.iperf_results:
+            w(_HTML_IPERF_TABLE_OPEN)
+            for r in result.iperf_results:
+                w(_HTML_IPERF_ROW.format(
+                    protocol=escape(r.protocol.upper()),
+                    duration=r.duration,
+                    throughput=r.throughput_mbps,
+                    retransmissions=r.retransmissions or "N/A",
+                    packet_loss=r.packet_loss or "N/A",
+                    jitter=r.jitter_ms or "N/A"
+                ))
+            w(_HTML_TABLE_CLOSE)
+        
+        if result.latency_results:
+            w(_HTML_LATENCY_TABLE_OPEN)
+            for r in result.latency_results:
+                w(_HTML_LATENCY_ROW.format(
+                    rtt_min=r.rtt_min_ms,
+                    rtt_max=r.rtt_max_ms,
+                    rtt_mean=r.rtt_mean_ms,
+                    rtt_std=r.rtt_std_ms,
+                    jitter=r.jitter_ms,
+                    packet_loss=r.packet_loss_percent,
+                    packets_sent=r.packets_sent,
+                    packets_received=r.packets_received
+                ))
+            w(_HTML_TABLE_CLOSE)
+        
+        w(_HTML_THRESHOLDS_OPEN)
+        for key, value in result.thresholds.items():
+            w(_HTML_THRESHOLD_ROW.format(key=escape(str(key)), value=escape(str(value))))
+        w(_HTML_FOOT)
         
-        return html
+        return buf.getvalue()
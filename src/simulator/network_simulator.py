@@ -7,16 +7,35 @@ la simulation réseau Containernet.
 
 import sys
 import signal
-import yaml
+import functools
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
 from loguru import logger
-from mininet.net import Containernet
-from mininet.node import Controller
-from mininet.cli import CLI
-from mininet.log import setLogLevel, info
 from .topology import create_topology, load_topology_from_config
 
+# Mininet n'est chargé qu'au démarrage du réseau (voir NetworkSimulator.start)
+if TYPE_CHECKING:
+    from mininet.net import Containernet
+
+
+def _requires_net(default_factory: Optional[Callable[[], Any]] = None):
+    """
+    Décorateur : n'exécute la méthode que si le réseau est démarré.
+    
+    Args:
+        default_factory: Fabrique de la valeur retournée quand le réseau
+            n'est pas démarré (None par défaut)
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.net is None:
+                logger.error("Le réseau n'est pas démarré")
+                return default_factory() if default_factory else None
+            return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
 
 class NetworkSimulator:
     """
@@ -34,16 +53,19 @@ class NetworkSimulator:
             config_path: Chemin vers le fichier de configuration
         """
         self.config_path = config_path
-        self.net: Optional[Containernet] = None
+        self.net: Optional["Containernet"] = None
         self.config: dict = {}
         self._load_config()
         
-        # Configuration des logs
+        # Configuration des logs (écriture asynchrone)
         logger.add(
             "logs/network_simulator.log",
             rotation="10 MB",
             retention="7 days",
-            level="INFO"
+            level="INFO",
+            enqueue=True,
+            backtrace=False,
+            diagnose=False
         )
     
     def _load_config(self):
@@ -58,7 +80,8 @@ class NetworkSimulator:
                 "latency_ms": 10,
                 "packet_loss": 0.1,
                 "bandwidth_mbps": 100,
-                "switch_name": "s1"
+                "switch_name": "s1",
+                "docker_image": "nicolaka/netshoot"
             }
     
     def start(self, interactive: bool = False):
@@ -72,6 +95,11 @@ class NetworkSimulator:
             logger.warning("Le réseau est déjà démarré")
             return
         
+        from mininet.net import Containernet
+        from mininet.node import Controller
+        from mininet.cli import CLI
+        from mininet.log import setLogLevel, info
+        
         logger.info("Démarrage de la simulation réseau...")
         setLogLevel("info")
         
@@ -86,7 +114,8 @@ class NetworkSimulator:
             latency_ms=self.config.get("latency_ms", 10),
             packet_loss=self.config.get("packet_loss", 0.1),
             bandwidth_mbps=self.config.get("bandwidth_mbps"),
-            switch_name=self.config.get("switch_name", "s1")
+            switch_name=self.config.get("switch_name", "s1"),
+            docker_image=self.config.get("docker_image", "nicolaka/netshoot")
         )
         
         # Démarrer le réseau
@@ -119,6 +148,7 @@ class NetworkSimulator:
         self.stop()
         sys.exit(0)
     
+    @_requires_net()
     def get_host(self, host_name: str):
         """
         Récupère un hôte par son nom.
@@ -129,16 +159,13 @@ class NetworkSimulator:
         Returns:
             Instance de l'hôte ou None si non trouvé
         """
-        if self.net is None:
-            logger.error("Le réseau n'est pas démarré")
-            return None
-        
         try:
             return self.net.get(host_name)
         except KeyError:
             logger.error(f"Hôte '{host_name}' non trouvé")
             return None
     
+    @_requires_net(default_factory=list)
     def get_all_hosts(self):
         """
         Récupère tous les hôtes du réseau.
@@ -146,18 +173,11 @@ class NetworkSimulator:
         Returns:
             Liste des hôtes
         """
-        if self.net is None:
-            logger.error("Le réseau n'est pas démarré")
-            return []
-        
         return self.net.hosts
     
+    @_requires_net()
     def ping_all(self):
         """Teste la connectivité entre tous les hôtes."""
-        if self.net is None:
-            logger.error("Le réseau n'est pas démarré")
-            return
-        
         logger.info("Test de connectivité (ping all)...")
         self.net.pingAll()
 
@@ -5,25 +5,27 @@ Ce module fournit des fonctions pour créer différentes topologies réseau
 simulées utilisant Containernet (Mininet + Docker).
 """
 
-from mininet.net import Containernet
-from mininet.node import Controller
-from mininet.cli import CLI
-from mininet.log import info, setLogLevel
-from mininet.link import TCLink
-import yaml
-from pathlib import Path
-from typing import Dict, Any, Optional
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, Optional
+
+from ..utils.config_cache import load_cached_yaml
+
+# Mininet est importé à l'usage : charger une configuration n'en dépend pas
+if TYPE_CHECKING:
+    from mininet.net import Containernet
 
 
 def create_topology(
-    net: Containernet,
+    net: "Containernet",
     topology_type: str = "star",
     hosts: int = 4,
     latency_ms: int = 10,
     packet_loss: float = 0.1,
     bandwidth_mbps: Optional[int] = None,
-    switch_name: str = "s1"
-) -> Containernet:
+    switch_name: str = "s1",
+    docker_image: str = "nicolaka/netshoot"
+) -> "Containernet":
     """
     Crée une topologie réseau selon le type spécifié.
     
@@ -35,6 +37,7 @@ def create_topology(
         packet_loss: Perte de paquets en pourcentage (0.0-100.0)
         bandwidth_mbps: Bande passante en Mbps (None pour illimité)
         switch_name: Nom du switch principal
+        docker_image: Image Docker des hôtes (doit fournir iperf3, ping et ss)
         
     Returns:
         Réseau Containernet configuré
@@ -42,6 +45,8 @@ def create_topology(
     Raises:
         ValueError: Si le type de topologie n'est pas supporté
     """
+    from mininet.log import info
+    
     info(f"*** Création de la topologie {topology_type} avec {hosts} hôtes\n")
     
     # Ajouter le contrôleur
@@ -50,21 +55,33 @@ def create_topology(
     # Créer le switch
     switch = net.addSwitch(switch_name)
     
-    # Créer les hôtes Docker
-    host_list = []
+    # Créer les hôtes Docker en parallèle : chaque addDocker attend surtout le
+    # démon Docker (création et démarrage du conteneur). addHost n'est pas
+    # thread-safe (compteur nextIP, ajout à net.hosts dans l'ordre de fin) :
+    # l'IP est donc toujours explicite et l'ordre est rétabli ensuite.
+    with ThreadPoolExecutor(max_workers=max(1, min(hosts, 16))) as executor:
+        futures = [
+            executor.submit(
+                net.addDocker,
+                f"h{i}",
+                dimage=docker_image,
+                ip=f"10.0.0.{i}/24",
+                dcmd="bash",
+                cpu_period=50000,
+                cpu_quota=25000
+            )
+            for i in range(1, hosts + 1)
+        ]
+        # Ordre h1..hN conservé, quel que soit l'ordre de fin des créations
+        host_list = [future.result() for future in futures]
+    
+    # net.hosts dans l'ordre h1..hN (les tests utilisent h1 et h2 comme serveur
+    # et client) et compteur d'adresses cohérent pour d'éventuels hôtes ajoutés ensuite
+    net.hosts = [host for host in net.hosts if host not in host_list] + host_list
+    net.nextIP = hosts + 1
+    
     for i in range(1, hosts + 1):
-        host_name = f"h{i}"
-        # Utiliser une image Docker légère avec les outils réseau
-        host = net.addDocker(
-            host_name,
-            dimage="ubuntu:22.04",
-            ip=f"10.0.0.{i}/24",
-            dcmd="bash",
-            cpu_period=50000,
-            cpu_quota=25000
-        )
-        host_list.append(host)
-        info(f"*** Hôte {host_name} créé avec IP 10.0.0.{i}\n")
+        info(f"*** Hôte h{i} créé avec IP 10.0.0.{i}\n")
     
     # Configurer les liens selon la topologie
     if topology_type == "star":
@@ -80,7 +97,7 @@ def create_topology(
 
 
 def _create_star_topology(
-    net: Containernet,
+    net: "Containernet",
     switch: Any,
     hosts: list,
     latency_ms: int,
@@ -88,6 +105,9 @@ def _create_star_topology(
     bandwidth_mbps: Optional[int]
 ):
     """Crée une topologie en étoile (tous les hôtes connectés au switch)."""
+    from mininet.link import TCLink
+    from mininet.log import info
+    
     info("*** Configuration topologie STAR\n")
     
     link_params = {
@@ -103,7 +123,7 @@ def _create_star_topology(
 
 
 def _create_line_topology(
-    net: Containernet,
+    net: "Containernet",
     switch: Any,
     hosts: list,
     latency_ms: int,
@@ -111,6 +131,9 @@ def _create_line_topology(
     bandwidth_mbps: Optional[int]
 ):
     """Crée une topologie linéaire (hôtes connectés en chaîne)."""
+    from mininet.link import TCLink
+    from mininet.log import info
+    
     info("*** Configuration topologie LINE\n")
     
     link_params = {
@@ -131,13 +154,16 @@ def _create_line_topology(
 
 
 def _create_mesh_topology(
-    net: Containernet,
+    net: "Containernet",
     hosts: list,
     latency_ms: int,
     packet_loss: float,
     bandwidth_mbps: Optional[int]
 ):
     """Crée une topologie maillée (tous les hôtes connectés entre eux)."""
+    from mininet.link import TCLink
+    from mininet.log import info
+    
     info("*** Configuration topologie MESH\n")
     
     link_params = {
@@ -147,11 +173,12 @@ def _create_mesh_topology(
     if bandwidth_mbps:
         link_params["bw"] = bandwidth_mbps
     
-    # Connecter chaque hôte à tous les autres
-    for i, host1 in enumerate(hosts):
-        for host2 in hosts[i + 1:]:
-            net.addLink(host1, host2, cls=TCLink, **link_params)
-            info(f"*** Lien créé: {host1.name} <-> {host2.name}\n")
+    # Connecter chaque hôte à tous les autres ; O(n²) liens, un seul message
+    # récapitulatif plutôt qu'une ligne de log par lien
+    for host1, host2 in itertools.combinations(hosts, 2):
+        net.addLink(host1, host2, cls=TCLink, **link_params)
+    
+    info(f"*** {len(hosts) * (len(hosts) - 1) // 2} liens créés entre {len(hosts)} hôtes\n")
 
 
 def load_topology_from_config(config_path: str = "config/config.yaml") -> Dict[str, Any]:
@@ -164,17 +191,16 @@ def load_topology_from_config(config_path: str = "config/config.yaml") -> Dict[s
     Returns:
         Dictionnaire de configuration
     """
-    config_file = Path(config_path)
-    if not config_file.exists():
-        raise FileNotFoundError(f"Fichier de configuration non trouvé: {config_path}")
-    
-    with open(config_file, "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
-    
-    return config.get("network", {})
+    return load_cached_yaml(config_path).get("network", {})
 
 
-if __name__ == "__main__":
+def _main():
+    """Démarre la topologie configurée et ouvre le CLI Mininet."""
+    from mininet.net import Containernet
+    from mininet.node import Controller
+    from mininet.cli import CLI
+    from mininet.log import info, setLogLevel
+    
     # Exemple d'utilisation
     setLogLevel("info")
     
@@ -189,7 +215,8 @@ if __name__ == "__main__":
             "latency_ms": 10,
             "packet_loss": 0.1,
             "bandwidth_mbps": 100,
-            "switch_name": "s1"
+            "switch_name": "s1",
+            "docker_image": "nicolaka/netshoot"
         }
     
     # Créer le réseau
@@ -202,7 +229,8 @@ if __name__ == "__main__":
         latency_ms=network_config.get("latency_ms", 10),
         packet_loss=network_config.get("packet_loss", 0.1),
         bandwidth_mbps=network_config.get("bandwidth_mbps"),
-        switch_name=network_config.get("switch_name", "s1")
+        switch_name=network_config.get("switch_name", "s1"),
+        docker_image=network_config.get("docker_image", "nicolaka/netshoot")
     )
     
     # Démarrer le réseau
@@ -214,3 +242,7 @@ if __name__ == "__main__":
     
     # Arrêter le réseau
     net.stop()
+
+
+if __name__ == "__main__":
+    _main()
@@ -5,15 +5,64 @@ Ce module fournit une interface Python pour exécuter des tests iperf3
 et parser les résultats.
 """
 
+import re
 import subprocess
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from loguru import logger
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson est optionnel (extra "speedups")
+    _json_loads = json.loads
 
-@dataclass
+# Débit dans la sortie texte d'iperf3, ex. "  94.1 Mbits/sec  0   sender"
+_IPERF_BW_RE = re.compile(r"(\d+(?:\.\d+)?)\s+([KMG])bits/sec", re.IGNORECASE)
+_BW_UNIT_TO_MBPS = {"k": 1e-3, "m": 1.0, "g": 1e3}
+
+# Marge (s) laissée au client iperf3 au-delà de la durée du test avant de l'arrêter
+_CLIENT_TIMEOUT_MARGIN = 10
+
+# Clé "end" de premier niveau dans la sortie -J d'iperf3 (indentée d'une tabulation)
+_IPERF_END_RE = re.compile(r'^\t"end":\s*', re.MULTILINE)
+
+
+def _load_end_section(output: str) -> Dict:
+    """
+    Extrait la section ``end`` de la sortie JSON d'iperf3.
+    
+    Seul le résumé ``end`` est exploité ; le tableau ``intervals`` qui le
+    précède grossit avec la durée du test. La section est donc découpée
+    (jusqu'à son accolade fermante, seule à être indentée d'une tabulation)
+    puis décodée seule, avec orjson s'il est disponible. Repli sur un parsing
+    complet si la sortie n'a pas la mise en forme attendue.
+    
+    Args:
+        output: Sortie JSON d'iperf3
+        
+    Returns:
+        Dictionnaire de la section ``end`` (vide si absente)
+    """
+    match = _IPERF_END_RE.search(output)
+    if match:
+        close = output.find("\n\t}", match.end())
+        if close != -1:
+            try:
+                end_data = _json_loads(output[match.end():close + 3])
+                if isinstance(end_data, dict):
+                    return end_data
+            except ValueError:
+                pass
+    
+    return _json_loads(output).get("end", {})
+
+
+@dataclass(slots=True)
 class IperfResult:
     """Résultat d'un test iperf3."""
     protocol: str  # "tcp" ou "udp"
@@ -47,34 +96,80 @@ class IperfTest:
         self.client_host = client_host
         self.port = port
         self.server_process: Optional[subprocess.Popen] = None
+        # IP() interroge l'hôte Mininet : résolue une seule fois
+        self._server_ip = server_host.IP()
     
     def start_server(self, protocol: str = "tcp"):
         """
         Démarre le serveur iperf3.
         
+        Sans effet si le serveur tourne déjà : il accepte les clients des deux
+        protocoles et peut être partagé par toutes les itérations. Un serveur
+        arrêté entre-temps est relancé.
+        
         Args:
-            protocol: "tcp" ou "udp"
+            protocol: "tcp" ou "udp" (sans effet sur le serveur, qui sert les deux)
         """
         if self.server_process is not None:
-            logger.warning("Le serveur iperf3 est déjà démarré")
-            return
+            if self.server_process.poll() is None:
+                logger.debug(f"Serveur iperf3 déjà démarré sur le port {self.port}")
+                return
+            logger.warning(f"Le serveur iperf3 du port {self.port} s'est arrêté, redémarrage")
+            self.server_process = None
         
-        # Construire la commande iperf3
-        cmd = ["iperf3", "-s", "-p", str(self.port), "-1"]
-        if protocol == "udp":
-            cmd.append("-u")
+        # Construire la commande iperf3 (serveur persistant, réutilisé entre les
+        # tests). Pas de -u : iperf3 le refuse en mode serveur, le protocole est
+        # choisi par le client
+        cmd = ["iperf3", "-s", "-p", str(self.port)]
         
         logger.info(f"Démarrage du serveur iperf3 sur {self.server_host.name}:{self.port}")
         
-        # Exécuter sur l'hôte serveur
-        self.server_process = self.server_host.popen(cmd)
-        time.sleep(1)  # Attendre que le serveur démarre
+        # Exécuter sur l'hôte serveur. La sortie n'est jamais lue : un pipe finirait
+        # par se remplir et bloquer le serveur persistant, d'où DEVNULL
+        self.server_process = self.server_host.popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True
+        )
+        if not self._wait_for_server():
+            logger.warning(f"Le serveur iperf3 n'écoute pas encore sur le port {self.port}")
+    
+    def _wait_for_server(self, timeout: float = 2.0, poll_interval: float = 0.01) -> bool:
+        """
+        Attend que le serveur iperf3 écoute sur son port.
+        
+        La vérification se fait dans l'espace de noms réseau de l'hôte serveur
+        (``ss``) : une connexion de test serait comptée par iperf3 comme un
+        client et n'est pas routable depuis l'hôte de la machine de test.
+        
+        Args:
+            timeout: Délai maximal d'attente en secondes
+            poll_interval: Intervalle entre deux vérifications en secondes
+            
+        Returns:
+            True si le port est en écoute avant le délai
+        """
+        deadline = time.monotonic() + timeout
+        check = f"ss -Hltn 'sport = :{self.port}'"
+        
+        while True:
+            if self.server_host.cmd(check).strip():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_interval)
     
     def stop_server(self):
         """Arrête le serveur iperf3."""
         if self.server_process:
             self.server_process.terminate()
-            self.server_process.wait()
+            try:
+                self.server_process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                logger.warning("Le serveur iperf3 ne répond pas à SIGTERM, arrêt forcé")
+                self.server_process.kill()
+                self.server_process.wait(timeout=1)
             self.server_process = None
             logger.info("Serveur iperf3 arrêté")
     
@@ -83,16 +178,28 @@ class IperfTest:
         protocol: str = "tcp",
         duration: int = 60,
         bitrate: Optional[str] = None,
-        json_output: bool = True
+        json_output: bool = True,
+        min_throughput_mbps: Optional[float] = None,
+        link_capacity_mbps: Optional[float] = None,
+        ensure_server: bool = True
     ) -> IperfResult:
         """
         Exécute un test iperf3.
         
+        Si ``min_throughput_mbps`` et ``link_capacity_mbps`` sont fournis (avec
+        la sortie JSON), la sortie est lue au fil de l'eau (``--json-stream``,
+        iperf3 >= 3.13) et le test est interrompu dès que le débit minimal ne
+        peut plus être atteint, même au débit maximal du lien sur le temps restant.
+        
         Args:
             protocol: "tcp" ou "udp"
             duration: Durée du test en secondes
             bitrate: Débit cible (ex: "10M" pour 10 Mbps, None pour illimité)
             json_output: Utiliser le format JSON pour la sortie
+            min_throughput_mbps: Débit moyen minimal attendu (Mbps)
+            link_capacity_mbps: Débit maximal du lien testé (Mbps)
+            ensure_server: Démarrer (ou relancer) le serveur avant le test ;
+                False quand l'appelant s'en est déjà chargé
             
         Returns:
             Résultat du test
@@ -100,13 +207,14 @@ class IperfTest:
         Raises:
             RuntimeError: Si le test échoue
         """
-        if self.server_process is None:
+        # Démarre le serveur, ou le relance s'il s'est arrêté
+        if ensure_server:
             self.start_server(protocol)
         
         # Construire la commande client
         cmd = [
             "iperf3",
-            "-c", self.server_host.IP(),
+            "-c", self._server_ip,
             "-p", str(self.port),
             "-t", str(duration),
         ]
@@ -121,9 +229,24 @@ class IperfTest:
         
         logger.info(f"Exécution du test iperf3 ({protocol}) de {duration}s...")
         
+        fail_fast = json_output and min_throughput_mbps is not None and link_capacity_mbps
+        
         try:
-            # Exécuter sur l'hôte client
-            result = self.client_host.cmd(cmd)
+            if fail_fast:
+                return self._run_streaming(
+                    cmd, protocol, duration, min_throughput_mbps, link_capacity_mbps
+                )
+            
+            # Exécuter sur l'hôte client sans passer par son shell : le thread
+            # appelant peut piloter d'autres tests iperf3 en parallèle
+            proc = self.client_host.popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                out, _ = proc.communicate(timeout=duration + _CLIENT_TIMEOUT_MARGIN)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
+            result = out.decode()
             
             if json_output:
                 return self._parse_json_result(result, protocol, duration)
@@ -134,79 +257,175 @@ class IperfTest:
             logger.error(f"Erreur lors du test iperf3: {e}")
             raise RuntimeError(f"Test iperf3 échoué: {e}")
     
-    def _parse_json_result(self, output: str, protocol: str, duration: int) -> IperfResult:
-        """Parse le résultat JSON d'iperf3."""
-        try:
-            data = json.loads(output)
+    def _run_streaming(
+        self,
+        cmd: List[str],
+        protocol: str,
+        duration: int,
+        min_throughput_mbps: float,
+        link_capacity_mbps: float
+    ) -> IperfResult:
+        """
+        Exécute le client iperf3 en lisant ses événements JSON ligne par ligne.
+        
+        Chaque intervalle met à jour le volume transféré ; si ce volume, augmenté
+        de ce que le lien peut encore écouler d'ici la fin du test, reste
+        inférieur au volume requis par ``min_throughput_mbps``, le client est
+        arrêté et le débit moyen mesuré jusque-là est retourné.
+        
+        Args:
+            cmd: Commande client (avec -J)
+            protocol: "tcp" ou "udp"
+            duration: Durée du test en secondes
+            min_throughput_mbps: Débit moyen minimal attendu (Mbps)
+            link_capacity_mbps: Débit maximal du lien testé (Mbps)
             
-            # Extraire les informations selon le protocole
-            if protocol == "tcp":
-                end_data = data.get("end", {})
-                sum_sent = end_data.get("sum_sent", {})
-                sum_received = end_data.get("sum_received", {})
-                
-                throughput_mbps = sum_received.get("bits_per_second", 0) / 1e6
-                retransmissions = sum_sent.get("retransmits", 0)
-                bytes_sent = sum_sent.get("bytes", 0)
-                bytes_received = sum_received.get("bytes", 0)
-                
-                return IperfResult(
-                    protocol=protocol,
-                    duration=duration,
-                    throughput_mbps=throughput_mbps,
-                    retransmissions=retransmissions,
-                    bytes_sent=bytes_sent,
-                    bytes_received=bytes_received
-                )
+        Returns:
+            Résultat du test (partiel en cas d'interruption anticipée)
             
-            else:  # UDP
-                end_data = data.get("end", {})
-                sum_data = end_data.get("sum", {})
+        Raises:
+            RuntimeError: Si iperf3 signale une erreur ou ne produit pas de résumé
+        """
+        required_bits = min_throughput_mbps * 1e6 * duration
+        capacity_bps = link_capacity_mbps * 1e6
+        bits_transferred = 0.0
+        end_data = None
+        
+        proc = self.client_host.popen(
+            cmd + ["--json-stream", "--forceflush"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1
+        )
+        # La lecture ligne à ligne est bloquante : le délai global est garanti
+        # par un minuteur qui tue le client
+        timed_out = threading.Event()
+        
+        def on_timeout():
+            timed_out.set()
+            proc.kill()
+        
+        watchdog = threading.Timer(duration + _CLIENT_TIMEOUT_MARGIN, on_timeout)
+        watchdog.start()
+        
+        try:
+            for line in proc.stdout:
+                if not line.strip():
+                    continue
+                event = _json_loads(line)
+                kind = event.get("event")
+                data = event.get("data", {})
                 
-                throughput_mbps = sum_data.get("bits_per_second", 0) / 1e6
-                packet_loss = sum_data.get("lost_percent", 0)
-                jitter_ms = sum_data.get("jitter_ms", 0)
-                bytes_sent = sum_data.get("bytes", 0)
-                bytes_received = sum_data.get("bytes", 0)
+                if kind == "interval":
+                    summary = data.get("sum", {})
+                    bits_transferred += summary.get("bits_per_second", 0) * summary.get("seconds", 0)
+                    elapsed = summary.get("end", 0)
+                    remaining = max(duration - elapsed, 0)
+                    
+                    if bits_transferred + remaining * capacity_bps < required_bits:
+                        throughput_mbps = bits_transferred / elapsed / 1e6 if elapsed else 0.0
+                        logger.warning(
+                            f"Débit minimal de {min_throughput_mbps} Mbps inatteignable "
+                            f"après {elapsed:.1f}s ({throughput_mbps:.2f} Mbps), test interrompu"
+                        )
+                        return IperfResult(
+                            protocol=protocol,
+                            duration=elapsed,
+                            throughput_mbps=throughput_mbps
+                        )
                 
-                return IperfResult(
-                    protocol=protocol,
-                    duration=duration,
-                    throughput_mbps=throughput_mbps,
-                    packet_loss=packet_loss,
-                    jitter_ms=jitter_ms,
-                    bytes_sent=bytes_sent,
-                    bytes_received=bytes_received
-                )
+                elif kind == "end":
+                    end_data = data
+                
+                elif kind == "error":
+                    raise RuntimeError(f"iperf3: {data}")
+        
+        finally:
+            watchdog.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            proc.stdout.close()
+        
+        if timed_out.is_set():
+            raise RuntimeError(
+                f"Client iperf3 arrêté après {duration + _CLIENT_TIMEOUT_MARGIN}s sans fin de test"
+            )
+        if end_data is None:
+            raise RuntimeError("Sortie iperf3 sans résumé final")
+        
+        return self._result_from_end(end_data, protocol, duration)
+    
+    def _parse_json_result(self, output: str, protocol: str, duration: int) -> IperfResult:
+        """Parse le résultat JSON d'iperf3."""
+        try:
+            return self._result_from_end(_load_end_section(output), protocol, duration)
         
-        except (json.JSONDecodeError, KeyError) as e:
+        # JSONDecodeError de json et d'orjson héritent tous deux de ValueError
+        except (ValueError, KeyError) as e:
             logger.error(f"Erreur lors du parsing JSON: {e}")
             raise RuntimeError(f"Impossible de parser le résultat iperf3: {e}")
     
+    def _result_from_end(self, end_data: Dict, protocol: str, duration: float) -> IperfResult:
+        """
+        Construit le résultat à partir de la section ``end`` d'iperf3.
+        
+        Args:
+            end_data: Section ``end`` (sortie -J ou événement ``end`` de --json-stream)
+            protocol: "tcp" ou "udp"
+            duration: Durée du test en secondes
+            
+        Returns:
+            Résultat du test
+        """
+        # Extraire les informations selon le protocole
+        if protocol == "tcp":
+            sum_sent = end_data.get("sum_sent", {})
+            sum_received = end_data.get("sum_received", {})
+            
+            throughput_mbps = sum_received.get("bits_per_second", 0) / 1e6
+            retransmissions = sum_sent.get("retransmits", 0)
+            bytes_sent = sum_sent.get("bytes", 0)
+            bytes_received = sum_received.get("bytes", 0)
+            
+            return IperfResult(
+                protocol=protocol,
+                duration=duration,
+                throughput_mbps=throughput_mbps,
+                retransmissions=retransmissions,
+                bytes_sent=bytes_sent,
+                bytes_received=bytes_received
+            )
+        
+        else:  # UDP
+            sum_data = end_data.get("sum", {})
+            
+            throughput_mbps = sum_data.get("bits_per_second", 0) / 1e6
+            packet_loss = sum_data.get("lost_percent", 0)
+            jitter_ms = sum_data.get("jitter_ms", 0)
+            bytes_sent = sum_data.get("bytes", 0)
+            bytes_received = sum_data.get("bytes", 0)
+            
+            return IperfResult(
+                protocol=protocol,
+                duration=duration,
+                throughput_mbps=throughput_mbps,
+                packet_loss=packet_loss,
+                jitter_ms=jitter_ms,
+                bytes_sent=bytes_sent,
+                bytes_received=bytes_received
+            )
+    
     def _parse_text_result(self, output: str, protocol: str, duration: int) -> IperfResult:
         """Parse le résultat texte d'iperf3 (fallback)."""
-        # Parsing basique du format texte
-        lines = output.split("\n")
+        # Le dernier débit de la sortie est celui du résumé final
+        matches = _IPERF_BW_RE.findall(output)
         throughput_mbps = 0.0
         
-        for line in lines:
-            if "bits/sec" in line.lower():
-                # Extraire le débit
-                parts = line.split()
-                for i, part in enumerate(parts):
-                    if "bits/sec" in part.lower():
-                        try:
-                            value = float(parts[i - 1])
-                            unit = parts[i].lower()
-                            if "g" in unit:
-                                throughput_mbps = value * 1000
-                            elif "m" in unit:
-                                throughput_mbps = value
-                            elif "k" in unit:
-                                throughput_mbps = value / 1000
-                            break
-                        except (ValueError, IndexError):
-                            pass
+        if matches:
+            value, unit = matches[-1]
+            throughput_mbps = float(value) * _BW_UNIT_TO_MBPS[unit.lower()]
         
         return IperfResult(
             protocol=protocol,
@@ -219,7 +438,9 @@ class IperfTest:
         protocol: str = "tcp",
         duration: int = 60,
         iterations: int = 5,
-        delay: int = 10
+        delay: int = 10,
+        min_throughput_mbps: Optional[float] = None,
+        link_capacity_mbps: Optional[float] = None
     ) -> List[IperfResult]:
         """
         Exécute plusieurs tests consécutifs.
@@ -229,19 +450,135 @@ class IperfTest:
             duration: Durée de chaque test
             iterations: Nombre d'itérations
             delay: Délai entre les tests (secondes)
+            min_throughput_mbps: Débit minimal pour l'arrêt anticipé (voir run_test)
+            link_capacity_mbps: Débit maximal du lien pour l'arrêt anticipé
             
         Returns:
             Liste des résultats
         """
         results = []
         
+        # Un seul serveur pour toutes les itérations
+        owns_server = self.server_process is None
+        if owns_server:
+            self.start_server(protocol)
+        
+        try:
+            for i in range(iterations):
+                logger.info(f"Itération {i+1}/{iterations}")
+                result = self.run_test(
+                    protocol=protocol,
+                    duration=duration,
+                    min_throughput_mbps=min_throughput_mbps,
+                    link_capacity_mbps=link_capacity_mbps
+                )
+                results.append(result)
+                
+                if i < iterations - 1:
+                    logger.info(f"Attente de {delay}s avant le prochain test...")
+                    time.sleep(delay)
+        finally:
+            if owns_server:
+                self.stop_server()
+        
+        return results
+
+
+def _sum_optional(values) -> Optional[float]:
+    """Somme des valeurs renseignées (None si aucune ne l'est)."""
+    values = [v for v in values if v is not None]
+    return sum(values) if values else None
+
+
+def merge_results(results: List[IperfResult]) -> IperfResult:
+    """
+    Agrège les résultats de flux iperf3 simultanés en un seul résultat.
+    
+    Débits, octets et retransmissions s'additionnent ; la perte est pondérée
+    par le volume de chaque flux et le jitter retenu est le plus élevé.
+    
+    Args:
+        results: Résultats des flux (même protocole, même durée)
+        
+    Returns:
+        Résultat agrégé
+    """
+    first = results[0]
+    
+    packet_loss = None
+    losses = [(r.packet_loss, r.bytes_sent or 0) for r in results if r.packet_loss is not None]
+    if losses:
+        weight = sum(w for _, w in losses)
+        if weight:
+            packet_loss = sum(loss * w for loss, w in losses) / weight
+        else:
+            packet_loss = sum(loss for loss, _ in losses) / len(losses)
+    
+    jitters = [r.jitter_ms for r in results if r.jitter_ms is not None]
+    
+    return IperfResult(
+        protocol=first.protocol,
+        duration=max(r.duration for r in results),
+        throughput_mbps=sum(r.throughput_mbps for r in results),
+        retransmissions=_sum_optional(r.retransmissions for r in results),
+        packet_loss=packet_loss,
+        jitter_ms=max(jitters) if jitters else None,
+        bytes_sent=_sum_optional(r.bytes_sent for r in results),
+        bytes_received=_sum_optional(r.bytes_received for r in results)
+    )
+
+
+def run_parallel_streams(
+    iperf_tests: List[IperfTest],
+    protocol: str = "tcp",
+    duration: int = 60,
+    iterations: int = 5,
+    delay: int = 10
+) -> List[IperfResult]:
+    """
+    Exécute des tests iperf3 simultanés, un client par serveur (port distinct).
+    
+    Un serveur iperf3 ne sert qu'un client à la fois sur un seul cœur : sur un
+    lien rapide, plusieurs paires client/serveur sont nécessaires pour
+    approcher le débit nominal. Chaque itération lance tous les clients en
+    même temps et agrège leurs résultats (voir merge_results).
+    
+    Args:
+        iperf_tests: Tests iperf3, un par port
+        protocol: "tcp" ou "udp"
+        duration: Durée de chaque test
+        iterations: Nombre d'itérations
+        delay: Délai entre les tests (secondes)
+        
+    Returns:
+        Liste des résultats agrégés, un par itération
+        
+    Raises:
+        RuntimeError: Si un serveur n'a pas pu être démarré
+    """
+    results = []
+    
+    with ThreadPoolExecutor(max_workers=len(iperf_tests)) as executor:
         for i in range(iterations):
-            logger.info(f"Itération {i+1}/{iterations}")
-            result = self.run_test(protocol=protocol, duration=duration)
-            results.append(result)
+            logger.info(f"Itération {i+1}/{iterations} ({len(iperf_tests)} flux)")
+            
+            # Serveurs démarrés (ou relancés) et vérifiés ici, une fois par
+            # itération : les clients lancés en parallèle n'y touchent plus
+            for iperf_test in iperf_tests:
+                iperf_test.start_server(protocol)
+                if iperf_test.server_process is None or iperf_test.server_process.poll() is not None:
+                    raise RuntimeError(f"Serveur iperf3 indisponible sur le port {iperf_test.port}")
+            
+            futures = [
+                executor.submit(
+                    iperf_test.run_test, protocol=protocol, duration=duration, ensure_server=False
+                )
+                for iperf_test in iperf_tests
+            ]
+            results.append(merge_results([future.result() for future in futures]))
             
             if i < iterations - 1:
                 logger.info(f"Attente de {delay}s avant le prochain test...")
                 time.sleep(delay)
-        
-        return results
+    
+    return results
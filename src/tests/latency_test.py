@@ -6,16 +6,46 @@ timestampés et en mesurant le RTT (Round-Trip Time).
 """
 
 import time
+import asyncio
+import math
 import socket
 import struct
 import threading
+from collections import deque
 from typing import List, Dict, Optional
 from dataclasses import dataclass
-from statistics import mean, stdev
+import numpy as np
 from loguru import logger
 
+# Formats binaires précompilés des paquets de test (timestamps entiers en ns)
+_CLIENT_TS = struct.Struct("q")   # timestamp client
+_ECHO_TS = struct.Struct("qq")    # timestamp client + timestamp serveur
+_TIMESPEC = struct.Struct("qq")   # struct timespec (64 bits) du message de contrôle
 
-@dataclass
+# Horodatage noyau des paquets reçus, seulement si le module socket expose la
+# constante (sa valeur varie selon l'architecture) ; sinon time.time_ns() à la
+# réception
+_SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", None)
+
+
+def _kernel_rx_ns(ancdata) -> Optional[int]:
+    """
+    Extrait l'heure d'arrivée noyau (CLOCK_REALTIME, ns) des données auxiliaires.
+    
+    Args:
+        ancdata: Données auxiliaires retournées par recvmsg
+        
+    Returns:
+        Timestamp en nanosecondes, ou None s'il est absent
+    """
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == _SO_TIMESTAMPNS and len(data) == _TIMESPEC.size:
+            sec, nsec = _TIMESPEC.unpack(data)
+            return sec * 1_000_000_000 + nsec
+    return None
+
+
+@dataclass(slots=True)
 class LatencyResult:
     """Résultat d'un test de latence."""
     rtt_min_ms: float
@@ -29,6 +59,30 @@ class LatencyResult:
     rtt_samples: List[float]
 
 
+class _EchoProtocol(asyncio.DatagramProtocol):
+    """Protocole UDP du serveur d'écho : renvoie le timestamp client et le sien."""
+    
+    def __init__(self, received_timestamps: deque):
+        self.received_timestamps = received_timestamps
+        self.transport: Optional[asyncio.DatagramTransport] = None
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def datagram_received(self, data, addr):
+        if len(data) >= _CLIENT_TS.size:  # Au moins un timestamp (8 bytes)
+            # Extraire le timestamp client
+            client_timestamp = _CLIENT_TS.unpack_from(data, 0)[0]
+            
+            # Créer la réponse avec timestamp serveur
+            server_timestamp = time.time_ns()
+            self.transport.sendto(_ECHO_TS.pack(client_timestamp, server_timestamp), addr)
+            self.received_timestamps.append(server_timestamp)
+    
+    def error_received(self, exc):
+        logger.error(f"Erreur serveur: {exc}")
+
+
 class LatencyTest:
     """
     Classe pour mesurer la latence réseau entre deux hôtes.
@@ -49,138 +103,202 @@ class LatencyTest:
         self.server_host = server_host
         self.client_host = client_host
         self.port = port
-        self.server_socket: Optional[socket.socket] = None
+        # IP() interroge l'hôte Mininet : résolue une seule fois
+        self._server_ip = server_host.IP()
+        self.server_transport: Optional[asyncio.DatagramTransport] = None
+        self.server_loop: Optional[asyncio.AbstractEventLoop] = None
         self.server_thread: Optional[threading.Thread] = None
-        self.running = False
-        self.received_timestamps: List[float] = []
+        # Derniers timestamps serveur (diagnostic), bornés pour les serveurs longue durée
+        self.received_timestamps: deque = deque(maxlen=10000)
     
     def start_server(self):
         """Démarre le serveur d'écho pour les tests de latence."""
-        if self.server_socket is not None:
+        if self.server_transport is not None:
             logger.warning("Le serveur de latence est déjà démarré")
             return
         
-        self.running = True
-        self.received_timestamps = []
+        self.received_timestamps.clear()
+        
+        # Boucle asyncio dédiée : les datagrammes sont traités dès leur arrivée,
+        # sans sondage par timeout
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.server_loop = loop
         
         def server_loop():
             """Boucle serveur qui renvoie les paquets avec timestamp."""
+            asyncio.set_event_loop(loop)
             try:
-                # Créer un socket UDP
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.bind(("0.0.0.0", self.port))
-                sock.settimeout(1.0)
-                self.server_socket = sock
-                
-                logger.info(f"Serveur de latence démarré sur le port {self.port}")
-                
-                while self.running:
-                    try:
-                        data, addr = sock.recvfrom(1024)
-                        if len(data) >= 8:  # Au moins un timestamp (8 bytes)
-                            # Extraire le timestamp client
-                            client_timestamp = struct.unpack("d", data[:8])[0]
-                            
-                            # Créer la réponse avec timestamp serveur
-                            server_timestamp = time.time()
-                            response = struct.pack("dd", client_timestamp, server_timestamp)
-                            
-                            sock.sendto(response, addr)
-                            self.received_timestamps.append(server_timestamp)
-                    except socket.timeout:
-                        continue
-                    except Exception as e:
-                        if self.running:
-                            logger.error(f"Erreur serveur: {e}")
-                        break
-                
-                sock.close()
-                logger.info("Serveur de latence arrêté")
-            
+                transport, _ = loop.run_until_complete(
+                    loop.create_datagram_endpoint(
+                        lambda: _EchoProtocol(self.received_timestamps),
+                        local_addr=("0.0.0.0", self.port)
+                    )
+                )
             except Exception as e:
                 logger.error(f"Erreur lors du démarrage du serveur: {e}")
+                loop.close()
+                ready.set()
+                return
+            
+            self.server_transport = transport
+            logger.info(f"Serveur de latence démarré sur le port {self.port}")
+            ready.set()
+            
+            try:
+                loop.run_forever()
+            finally:
+                transport.close()
+                loop.run_until_complete(asyncio.sleep(0))  # Laisser la fermeture aboutir
+                loop.close()
+                logger.info("Serveur de latence arrêté")
         
         self.server_thread = threading.Thread(target=server_loop, daemon=True)
         self.server_thread.start()
-        time.sleep(0.5)  # Attendre que le serveur démarre
+        ready.wait(timeout=2)  # Attendre que le serveur soit lié à son port
     
     def stop_server(self):
         """Arrête le serveur de latence."""
-        self.running = False
-        if self.server_socket:
-            self.server_socket.close()
+        loop = self.server_loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
         if self.server_thread:
             self.server_thread.join(timeout=2)
-        self.server_socket = None
-        logger.info("Serveur de latence arrêté")
+        # Le thread serveur journalise l'arrêt effectif de sa boucle
+        self.server_transport = None
+        self.server_loop = None
     
     def run_test(
         self,
         duration: int = 60,
         interval: float = 1.0,
-        packet_size: int = 64
+        packet_size: int = 64,
+        stop_event: Optional[threading.Event] = None
     ) -> LatencyResult:
         """
         Exécute un test de latence.
         
         Args:
-            duration: Durée du test en secondes
+            duration: Durée du test en secondes (math.inf : jusqu'à stop_event)
             interval: Intervalle entre les paquets en secondes
             packet_size: Taille des paquets en bytes
+            stop_event: Événement interrompant le test avant la fin de duration
             
         Returns:
             Résultat du test
         """
-        if self.server_socket is None:
+        if self.server_transport is None:
             self.start_server()
         
-        server_ip = self.server_host.IP()
-        rtt_samples = []
+        server_ip = self._server_ip
+        rtt_samples: List[float] = []
         packets_sent = 0
-        packets_received = 0
         
         # Créer le socket client
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.settimeout(2.0)
+        sock.settimeout(0.2)
+        
+        # Le noyau horodate les réponses à leur arrivée : le RTT n'inclut pas la
+        # latence d'ordonnancement de Python entre la réception et recvmsg.
+        # Même horloge (CLOCK_REALTIME) que time.time_ns() côté émission.
+        kernel_timestamps = False
+        if _SO_TIMESTAMPNS is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+                kernel_timestamps = True
+            except OSError:
+                logger.debug("SO_TIMESTAMPNS indisponible, horodatage en espace utilisateur")
+        
+        sending_done = threading.Event()
+        
+        def receive_loop():
+            """Collecte les réponses en parallèle de l'émission."""
+            buf = bytearray(1024)
+            deadline = None
+            
+            while True:
+                if sending_done.is_set():
+                    if len(rtt_samples) >= packets_sent:
+                        break
+                    # Délai de grâce pour les dernières réponses en vol
+                    if deadline is None:
+                        deadline = time.monotonic() + 2.0
+                    elif time.monotonic() >= deadline:
+                        break
+                
+                try:
+                    if kernel_timestamps:
+                        nbytes, ancdata, _, _ = sock.recvmsg_into([buf], 1024)
+                        receive_time = _kernel_rx_ns(ancdata) or time.time_ns()
+                    else:
+                        nbytes = sock.recv_into(buf)
+                        receive_time = time.time_ns()
+                except socket.timeout:
+                    continue
+                except Exception as e:
+                    logger.error(f"Erreur lors de la réception: {e}")
+                    break
+                
+                if nbytes >= _ECHO_TS.size:  # Deux timestamps (16 bytes)
+                    # Le serveur renvoie le timestamp d'émission : chaque réponse
+                    # porte son propre RTT, même si elle arrive en retard
+                    client_ts, server_ts = _ECHO_TS.unpack_from(buf, 0)
+                    rtt_samples.append((receive_time - client_ts) / 1e6)
         
         logger.info(f"Démarrage du test de latence ({duration}s, intervalle {interval}s)")
         
-        start_time = time.time()
-        end_time = start_time + duration
+        # Payload alloué une seule fois : seul le timestamp est réécrit à chaque paquet
+        packet_data = bytearray(b"x" * max(packet_size, _CLIENT_TS.size))
+        
+        receiver = threading.Thread(target=receive_loop, daemon=True)
+        receiver.start()
+        
+        # Liaisons locales pour la boucle d'émission (sensible quand interval -> 0)
+        monotonic_ns = time.monotonic_ns
+        time_ns = time.time_ns
+        pack_into = _CLIENT_TS.pack_into
+        sendto = sock.sendto
+        # L'attente entre deux paquets se fait sur l'événement d'arrêt :
+        # un arrêt anticipé est pris en compte immédiatement
+        if stop_event is None:
+            stop_event = threading.Event()
+        stop_requested = stop_event.is_set
+        sleep = stop_event.wait
+        address = (server_ip, self.port)
+        interval_ns = int(interval * 1e9)
+        next_send_ns = monotonic_ns()
+        end_ns = next_send_ns + int(duration * 1e9) if math.isfinite(duration) else math.inf
         
         try:
-            while time.time() < end_time:
+            # L'émission n'attend plus la réponse du paquet précédent
+            while next_send_ns < end_ns and not stop_requested():
                 # Envoyer un paquet avec timestamp
-                client_timestamp = time.time()
-                packet_data = struct.pack("d", client_timestamp) + b"x" * (packet_size - 8)
+                pack_into(packet_data, 0, time_ns())
                 
                 try:
-                    sock.sendto(packet_data, (server_ip, self.port))
+                    sendto(packet_data, address)
                     packets_sent += 1
-                    
-                    # Recevoir la réponse
-                    response, _ = sock.recvfrom(1024)
-                    server_receive_time = time.time()
-                    
-                    if len(response) >= 16:  # Deux timestamps (16 bytes)
-                        client_ts, server_ts = struct.unpack("dd", response[:16])
-                        
-                        # Calculer le RTT
-                        rtt = (server_receive_time - client_ts) * 1000  # en ms
-                        rtt_samples.append(rtt)
-                        packets_received += 1
-                
-                except socket.timeout:
-                    logger.warning("Timeout lors de la réception de la réponse")
                 except Exception as e:
-                    logger.error(f"Erreur lors de l'envoi/réception: {e}")
+                    logger.error(f"Erreur lors de l'envoi: {e}")
                 
-                # Attendre avant le prochain paquet
-                time.sleep(interval)
+                # Émissions cadencées sur une grille fixe (départ + k * interval) :
+                # le temps passé à émettre ne décale pas les paquets suivants.
+                # En cas de retard de plus d'un intervalle, la grille repart de
+                # maintenant plutôt que d'émettre une rafale de rattrapage.
+                next_send_ns += interval_ns
+                delay_ns = next_send_ns - monotonic_ns()
+                if delay_ns > 0:
+                    sleep(delay_ns / 1e9)
+                elif delay_ns < -interval_ns:
+                    next_send_ns = monotonic_ns()
         
         finally:
+            sending_done.set()
+            receiver.join()
             sock.close()
         
+        packets_received = min(len(rtt_samples), packets_sent)
+        
         # Calculer les statistiques
         if not rtt_samples:
             logger.warning("Aucun échantillon de latence reçu")
@@ -196,17 +314,18 @@ class LatencyTest:
                 rtt_samples=[]
             )
         
-        rtt_min = min(rtt_samples)
-        rtt_max = max(rtt_samples)
-        rtt_mean = mean(rtt_samples)
-        rtt_std = stdev(rtt_samples) if len(rtt_samples) > 1 else 0.0
+        # Statistiques vectorisées en une passe NumPy
+        samples = np.asarray(rtt_samples, dtype=np.float64)
+        rtt_min = float(samples.min())
+        rtt_max = float(samples.max())
+        rtt_mean = float(samples.mean())
         
-        # Calculer le jitter (écart type des différences de RTT)
-        if len(rtt_samples) > 1:
-            rtt_diffs = [abs(rtt_samples[i] - rtt_samples[i-1]) 
-                         for i in range(1, len(rtt_samples))]
-            jitter = mean(rtt_diffs)
+        if samples.size > 1:
+            rtt_std = float(samples.std(ddof=1))
+            # Jitter : moyenne des écarts absolus entre RTT successifs
+            jitter = float(np.abs(np.diff(samples)).mean())
         else:
+            rtt_std = 0.0
             jitter = 0.0
         
         packet_loss = ((packets_sent - packets_received) / packets_sent * 100) if packets_sent > 0 else 0.0
@@ -5,19 +5,46 @@ Ce module coordonne l'exécution de plusieurs types de tests (iperf3, latence)
 et génère des rapports consolidés.
 """
 
-import yaml
 import json
+import itertools
+import math
 import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 from datetime import datetime
+import numpy as np
 from loguru import logger
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields, is_dataclass
 
-from ..simulator.network_simulator import NetworkSimulator
-from .iperf_wrapper import IperfTest, IperfResult
+from ..utils.config_cache import load_cached_yaml
+from .iperf_wrapper import IperfTest, IperfResult, run_parallel_streams
 from .latency_test import LatencyTest, LatencyResult
-from ..monitoring.report_generator import ReportGenerator
+
+# Simulateur (Mininet) et générateur de rapports (matplotlib) sont importés à
+# l'usage : ils sont lourds, et report_generator importe ce module en retour
+if TYPE_CHECKING:
+    from ..simulator.network_simulator import NetworkSimulator
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel (extra "speedups")
+    orjson = None
+
+
+def _json_default(obj):
+    """
+    Sérialise pour json les objets qu'il ne connaît pas.
+    
+    Les dataclasses sont converties en dictionnaires à un seul niveau (json
+    parcourt lui-même les valeurs), sans la copie récursive d'asdict ; le
+    reste est converti en chaîne.
+    """
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    return str(obj)
 
 
 @dataclass
@@ -54,39 +81,91 @@ class TestCampaign:
         """
         self.config_path = config_path
         self.config: Dict = {}
-        self.simulator: Optional[NetworkSimulator] = None
+        self.simulator: Optional["NetworkSimulator"] = None
+        # Serveurs iperf3 persistants (un par port), arrêtés avec le réseau
+        self._iperf_tests: Dict[int, IperfTest] = {}
         self._load_config()
         
-        # Configuration des logs
+        # Configuration des logs (écriture asynchrone : pas d'I/O disque pendant
+        # les mesures)
         logger.add(
             "logs/test_campaign.log",
             rotation="10 MB",
             retention="7 days",
-            level=self.config.get("logging", {}).get("level", "INFO")
+            level=self.config.get("logging", {}).get("level", "INFO"),
+            enqueue=True,
+            backtrace=False,
+            diagnose=False
         )
     
     def _load_config(self):
         """Charge la configuration depuis le fichier YAML."""
-        config_file = Path(self.config_path)
-        if not config_file.exists():
-            raise FileNotFoundError(f"Fichier de configuration non trouvé: {self.config_path}")
-        
-        with open(config_file, "r", encoding="utf-8") as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_cached_yaml(self.config_path)
     
     def start_network(self):
         """Démarre la simulation réseau."""
+        from ..simulator.network_simulator import NetworkSimulator
+        
         logger.info("Démarrage de la simulation réseau...")
         self.simulator = NetworkSimulator(config_path=self.config_path)
         self.simulator.start()
-        time.sleep(3)  # Attendre que le réseau soit stable
         
-        # Test de connectivité
+        # Test de connectivité : un ping h1 -> h2, les deux seuls hôtes utilisés
+        # par les tests, répété jusqu'à ce que le réseau réponde (au lieu d'une
+        # pause fixe). Le ping complet O(H²) reste disponible sur demande.
         logger.info("Vérification de la connectivité...")
-        self.simulator.ping_all()
+        if not self._wait_for_network_ready():
+            logger.warning("Le réseau ne répond pas encore, poursuite de la campagne")
+        
+        if self.config.get("network", {}).get("full_connectivity_check", False):
+            self.simulator.ping_all()
+    
+    @staticmethod
+    def _probe_pair(source, target_ip: str) -> bool:
+        """
+        Envoie un unique ping d'un hôte vers une adresse.
+        
+        Args:
+            source: Hôte émetteur
+            target_ip: Adresse IP cible
+            
+        Returns:
+            True si la réponse est reçue
+        """
+        return source.cmd(f"ping -c1 -W1 {target_ip} > /dev/null 2>&1; echo $?").strip() == "0"
+    
+    def _wait_for_network_ready(self, timeout: float = 3.0, interval: float = 0.05) -> bool:
+        """
+        Attend qu'un premier ping passe entre les deux premiers hôtes.
+        
+        Args:
+            timeout: Délai maximal d'attente en secondes
+            interval: Intervalle entre deux tentatives en secondes
+            
+        Returns:
+            True si le réseau répond avant le délai
+        """
+        hosts = self.simulator.get_all_hosts()
+        if len(hosts) < 2:
+            return True
+        
+        source = hosts[0]
+        target_ip = hosts[1].IP()
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            if self._probe_pair(source, target_ip):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
     
     def stop_network(self):
         """Arrête la simulation réseau."""
+        for iperf_test in self._iperf_tests.values():
+            iperf_test.stop_server()
+        self._iperf_tests.clear()
+        
         if self.simulator:
             logger.info("Arrêt de la simulation réseau...")
             self.simulator.stop()
@@ -112,39 +191,119 @@ class TestCampaign:
         
         test_config = self.config.get("tests", {})
         protocols = test_config.get("protocols", ["tcp"])
-        duration = test_config.get("duration_seconds", 60)
-        iterations = test_config.get("iterations", 5)
-        delay = test_config.get("delay_between_iterations", 10)
         
-        all_results = []
+        # Flux simultanés par protocole, chacun sur son port à partir du port
+        # configuré : un serveur iperf3 n'exploite qu'un cœur
+        streams = max(1, int(test_config.get("parallel_streams", 1)))
+        ports = {}
+        for protocol in protocols:
+            base_port = test_config.get("ports", {}).get(protocol, 5001)
+            ports[protocol] = [base_port + i for i in range(streams)]
         
+        # Un serveur persistant par port, démarré avant toutes les itérations :
+        # les clients s'y reconnectent au lieu de relancer iperf3 à chaque protocole
         for protocol in protocols:
-            logger.info(f"Exécution des tests iperf3 ({protocol.upper()})...")
-            
-            iperf_test = IperfTest(
-                server_host=server_host,
-                client_host=client_host,
-                port=test_config.get("ports", {}).get(protocol, 5001)
-            )
-            
-            try:
-                results = iperf_test.run_multiple_tests(
-                    protocol=protocol,
-                    duration=duration,
-                    iterations=iterations,
-                    delay=delay
+            for port in ports[protocol]:
+                if port not in self._iperf_tests:
+                    self._iperf_tests[port] = IperfTest(
+                        server_host=server_host,
+                        client_host=client_host,
+                        port=port
+                    )
+                self._iperf_tests[port].start_server(protocol)
+        
+        # Protocoles en parallèle (opt-in) : les flux se partagent alors le lien,
+        # ce qui divise le temps de campagne mais influence les débits mesurés
+        parallel = test_config.get("parallel_protocols", False) and len(protocols) > 1
+        all_ports = [port for protocol in protocols for port in ports[protocol]]
+        if parallel and len(set(all_ports)) < len(all_ports):
+            logger.warning("Ports iperf3 communs à plusieurs protocoles, exécution séquentielle")
+            parallel = False
+        
+        if parallel:
+            with ThreadPoolExecutor(max_workers=len(protocols)) as executor:
+                futures = [
+                    executor.submit(
+                        self._run_protocol_tests,
+                        protocol,
+                        [self._iperf_tests[port] for port in ports[protocol]],
+                        test_config
+                    )
+                    for protocol in protocols
+                ]
+                # Résultats dans l'ordre des protocoles configurés
+                per_protocol_results = [future.result() for future in futures]
+        else:
+            per_protocol_results = [
+                self._run_protocol_tests(
+                    protocol,
+                    [self._iperf_tests[port] for port in ports[protocol]],
+                    test_config
                 )
-                all_results.extend(results)
+                for protocol in protocols
+            ]
+        
+        return list(itertools.chain.from_iterable(per_protocol_results))
+    
+    def _run_protocol_tests(
+        self,
+        protocol: str,
+        iperf_tests: List[IperfTest],
+        test_config: Dict
+    ) -> List[IperfResult]:
+        """
+        Exécute les itérations iperf3 d'un protocole sur ses propres ports.
+        
+        Args:
+            protocol: "tcp" ou "udp"
+            iperf_tests: Tests iperf3 dont les serveurs sont déjà démarrés, un par flux
+            test_config: Section "tests" de la configuration
             
-            finally:
-                iperf_test.stop_server()
+        Returns:
+            Liste des résultats iperf3 du protocole (agrégés sur les flux)
+        """
+        logger.info(f"Exécution des tests iperf3 ({protocol.upper()})...")
+        
+        if len(iperf_tests) > 1:
+            return run_parallel_streams(
+                iperf_tests,
+                protocol=protocol,
+                duration=test_config.get("duration_seconds", 60),
+                iterations=test_config.get("iterations", 5),
+                delay=test_config.get("delay_between_iterations", 10)
+            )
         
-        return all_results
+        iperf_test = iperf_tests[0]
+        
+        # Arrêt anticipé d'une itération dont le débit minimal devient inatteignable
+        min_throughput = None
+        link_capacity = None
+        if test_config.get("iperf_fail_fast", False):
+            min_throughput = test_config.get("thresholds", {}).get("min_throughput_mbps")
+            link_capacity = self.config.get("network", {}).get("bandwidth_mbps")
+        
+        return iperf_test.run_multiple_tests(
+            protocol=protocol,
+            duration=test_config.get("duration_seconds", 60),
+            iterations=test_config.get("iterations", 5),
+            delay=test_config.get("delay_between_iterations", 10),
+            min_throughput_mbps=min_throughput,
+            link_capacity_mbps=link_capacity
+        )
     
-    def run_latency_tests(self) -> List[LatencyResult]:
+    def run_latency_tests(
+        self,
+        stop_event: Optional[threading.Event] = None,
+        duration: Optional[float] = None
+    ) -> List[LatencyResult]:
         """
         Exécute les tests de latence.
         
+        Args:
+            stop_event: Événement interrompant le test avant sa durée nominale
+            duration: Durée du test (par défaut tests.duration_seconds) ; math.inf
+                pour mesurer jusqu'à stop_event
+            
         Returns:
             Liste des résultats de latence
         """
@@ -158,8 +317,8 @@ class TestCampaign:
         server_host = hosts[0]
         client_host = hosts[1]
         
-        test_config = self.config.get("tests", {})
-        duration = test_config.get("duration_seconds", 60)
+        if duration is None:
+            duration = self.config.get("tests", {}).get("duration_seconds", 60)
         
         logger.info("Exécution des tests de latence...")
         
@@ -170,7 +329,7 @@ class TestCampaign:
         )
         
         try:
-            result = latency_test.run_test(duration=duration, interval=1.0)
+            result = latency_test.run_test(duration=duration, interval=1.0, stop_event=stop_event)
             return [result]
         
         finally:
@@ -194,32 +353,45 @@ class TestCampaign:
         thresholds = self.config.get("tests", {}).get("thresholds", {})
         errors = []
         
+        # Comparaisons vectorisées ; seuls les résultats en échec sont ensuite
+        # parcourus, dans l'ordre d'origine, pour formater les messages
+        
         # Valider la latence
         if latency_results:
             max_latency = thresholds.get("max_latency_ms", 50)
-            for result in latency_results:
-                if result.rtt_mean_ms > max_latency:
+            max_loss = thresholds.get("max_packet_loss_percent", 1.0)
+            
+            count = len(latency_results)
+            rtt_mean = np.fromiter((r.rtt_mean_ms for r in latency_results), np.float64, count)
+            loss = np.fromiter((r.packet_loss_percent for r in latency_results), np.float64, count)
+            latency_bad = rtt_mean > max_latency
+            loss_bad = loss > max_loss
+            
+            for i in np.flatnonzero(latency_bad | loss_bad):
+                if latency_bad[i]:
                     errors.append(
-                        f"Latence moyenne ({result.rtt_mean_ms:.2f}ms) "
+                        f"Latence moyenne ({rtt_mean[i]:.2f}ms) "
                         f"dépasse le seuil ({max_latency}ms)"
                     )
                 
-                max_loss = thresholds.get("max_packet_loss_percent", 1.0)
-                if result.packet_loss_percent > max_loss:
+                if loss_bad[i]:
                     errors.append(
-                        f"Perte de paquets ({result.packet_loss_percent:.2f}%) "
+                        f"Perte de paquets ({loss[i]:.2f}%) "
                         f"dépasse le seuil ({max_loss}%)"
                     )
         
         # Valider le débit
         if iperf_results:
             min_throughput = thresholds.get("min_throughput_mbps", 10)
-            for result in iperf_results:
-                if result.throughput_mbps < min_throughput:
-                    errors.append(
-                        f"Débit ({result.throughput_mbps:.2f}Mbps) "
-                        f"inférieur au seuil ({min_throughput}Mbps)"
-                    )
+            
+            throughput = np.fromiter(
+                (r.throughput_mbps for r in iperf_results), np.float64, len(iperf_results)
+            )
+            for i in np.flatnonzero(throughput < min_throughput):
+                errors.append(
+                    f"Débit ({throughput[i]:.2f}Mbps) "
+                    f"inférieur au seuil ({min_throughput}Mbps)"
+                )
         
         passed = len(errors) == 0
         return passed, errors
@@ -233,6 +405,9 @@ class TestCampaign:
         """
         campaign_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         start_time = datetime.now().isoformat()
+        # Durée sur horloge monotone (insensible aux ajustements NTP) ;
+        # les dates ISO ne servent qu'à l'affichage
+        start_monotonic = time.monotonic()
         
         logger.info(f"Démarrage de la campagne de tests {campaign_id}")
         
@@ -244,6 +419,26 @@ class TestCampaign:
             # Démarrer le réseau
             self.start_network()
             
+            # Latence mesurée pendant les tests iperf3 (opt-in) : en arrière-plan,
+            # interrompue dès la fin des tests de débit
+            latency_during_iperf = self.config.get("tests", {}).get("latency_during_iperf", False)
+            if latency_during_iperf:
+                stop_latency = threading.Event()
+                latency_outcome: queue.Queue = queue.Queue(maxsize=1)
+                
+                def latency_worker():
+                    try:
+                        # Sans limite de durée : les tests iperf3 durent bien plus
+                        # que duration_seconds, stop_latency termine la mesure
+                        latency_outcome.put(
+                            self.run_latency_tests(stop_event=stop_latency, duration=math.inf)
+                        )
+                    except Exception as e:
+                        latency_outcome.put(e)
+                
+                latency_thread = threading.Thread(target=latency_worker, daemon=True)
+                latency_thread.start()
+            
             # Exécuter les tests iperf3
             try:
                 iperf_results = self.run_iperf_tests()
@@ -254,7 +449,15 @@ class TestCampaign:
             
             # Exécuter les tests de latence
             try:
-                latency_results = self.run_latency_tests()
+                if latency_during_iperf:
+                    stop_latency.set()
+                    latency_thread.join()
+                    outcome = latency_outcome.get()
+                    if isinstance(outcome, Exception):
+                        raise outcome
+                    latency_results = outcome
+                else:
+                    latency_results = self.run_latency_tests()
             except Exception as e:
                 error_msg = f"Erreur lors des tests de latence: {e}"
                 logger.error(error_msg)
@@ -274,7 +477,7 @@ class TestCampaign:
             self.stop_network()
         
         end_time = datetime.now().isoformat()
-        duration = (datetime.fromisoformat(end_time) - datetime.fromisoformat(start_time)).total_seconds()
+        duration = time.monotonic() - start_monotonic
         
         result = TestCampaignResult(
             campaign_id=campaign_id,
@@ -295,24 +498,36 @@ class TestCampaign:
     
     def _generate_reports(self, result: TestCampaignResult):
         """Génère les rapports de la campagne."""
+        from ..monitoring.report_generator import ReportGenerator
+        
         report_config = self.config.get("reporting", {})
         formats = report_config.get("formats", ["json", "html"])
         output_dir = Path(report_config.get("output_dir", "reports"))
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        generator = ReportGenerator()
-        
-        for fmt in formats:
-            if fmt == "json":
-                json_path = output_dir / f"campaign_{result.campaign_id}.json"
-                with open(json_path, "w", encoding="utf-8") as f:
-                    json.dump(asdict(result), f, indent=2, default=str)
-                logger.info(f"Rapport JSON généré: {json_path}")
-            
-            elif fmt == "html":
-                html_path = output_dir / f"campaign_{result.campaign_id}.html"
-                generator.generate_html_report(result, html_path)
-                logger.info(f"Rapport HTML généré: {html_path}")
+        with ReportGenerator() as generator:
+            for fmt in formats:
+                if fmt == "json":
+                    json_path = output_dir / f"campaign_{result.campaign_id}.json"
+                    if orjson is not None:
+                        # Sérialisation native des dataclasses, directement en bytes
+                        json_path.write_bytes(
+                            orjson.dumps(result, option=orjson.OPT_INDENT_2, default=str)
+                        )
+                    else:
+                        with open(json_path, "w", encoding="utf-8") as f:
+                            json.dump(result, f, indent=2, default=_json_default)
+                    logger.info(f"Rapport JSON généré: {json_path}")
+                
+                elif fmt == "html":
+                    html_path = output_dir / f"campaign_{result.campaign_id}.html"
+                    generator.generate_html_report(result, html_path)
+                    logger.info(f"Rapport HTML généré: {html_path}")
+                
+                elif fmt == "parquet":
+                    parquet_path = output_dir / f"campaign_{result.campaign_id}.parquet"
+                    for path in generator.generate_parquet(result, parquet_path):
+                        logger.info(f"Résultats Parquet générés: {path}")
 
 
 def main():
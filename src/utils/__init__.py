@@ -3,5 +3,6 @@ Module d'utilitaires
 """
 
 from .logger import setup_logging
+from .config_cache import load_cached_yaml
 
-__all__ = ["setup_logging"]
+__all__ = ["setup_logging", "load_cached_yaml"]
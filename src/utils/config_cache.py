@@ -0,0 +1,59 @@
+"""
+Chargement des fichiers de configuration YAML avec cache.
+
+Le parsing YAML est coûteux et la même configuration est relue par
+plusieurs composants (campagne, simulateur, topologie). Un cache LRU en
+mémoire, invalidé par la date de modification et la taille du fichier,
+l'évite au sein d'un même processus.
+"""
+
+import copy
+import yaml
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Tuple, Union
+
+# Parseur libyaml (C) quand PyYAML a été compilé avec, sinon parseur Python
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Cache LRU des configurations déjà parsées : chemin absolu -> (mtime_ns, taille, config).
+# Une modification du fichier change mtime/taille et invalide l'entrée.
+_CONFIG_CACHE: "OrderedDict[str, Tuple[int, int, Any]]" = OrderedDict()
+_CONFIG_CACHE_MAX = 32
+
+
+def load_cached_yaml(config_path: Union[str, Path]) -> Any:
+    """
+    Charge un fichier YAML en réutilisant les résultats déjà parsés.
+
+    Args:
+        config_path: Chemin vers le fichier YAML
+
+    Returns:
+        Contenu du fichier (copie indépendante du cache)
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    config_file = Path(config_path)
+    if not config_file.exists():
+        raise FileNotFoundError(f"Fichier de configuration non trouvé: {config_path}")
+
+    stat = config_file.stat()
+    key = str(config_file.resolve())
+    cached = _CONFIG_CACHE.get(key)
+
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        _CONFIG_CACHE.move_to_end(key)
+        config = cached[2]
+    else:
+        with open(config_file, "r", encoding="utf-8") as f:
+            config = yaml.load(f, Loader=_YAML_LOADER)
+
+        _CONFIG_CACHE[key] = (stat.st_mtime_ns, stat.st_size, config)
+        _CONFIG_CACHE.move_to_end(key)
+        if len(_CONFIG_CACHE) > _CONFIG_CACHE_MAX:
+            _CONFIG_CACHE.popitem(last=False)
+
+    # Copie : l'appelant peut modifier le résultat sans altérer le cache
+    return copy.deepcopy(config)
@@ -6,6 +6,14 @@ from loguru import logger
 import sys
 from pathlib import Path
 
+# Format console (balises de couleur loguru) et format fichier sans balises :
+# le sink fichier n'a aucun balisage à interpréter ni à retirer
+_CONSOLE_FMT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>"
+)
+_FILE_FMT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}"
+
 
 def setup_logging(level: str = "INFO", log_file: str = None):
     """
@@ -18,12 +26,16 @@ def setup_logging(level: str = "INFO", log_file: str = None):
     # Supprimer le handler par défaut
     logger.remove()
     
-    # Ajouter le handler console
+    # Ajouter le handler console. enqueue=True : formatage et écriture se font
+    # dans un thread dédié, l'appel de log ne fait qu'empiler le message
     logger.add(
         sys.stderr,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
+        format=_CONSOLE_FMT,
         level=level,
-        colorize=True
+        colorize=sys.stderr.isatty(),
+        enqueue=True,
+        backtrace=False,
+        diagnose=False
     )
     
     # Ajouter le handler fichier si spécifié
@@ -33,9 +45,12 @@ def setup_logging(level: str = "INFO", log_file: str = None):
         
         logger.add(
             log_file,
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}",
+            format=_FILE_FMT,
             level=level,
             rotation="10 MB",
             retention="7 days",
-            compression="zip"
+            compression="zip",
+            enqueue=True,
+            backtrace=False,
+            diagnose=False
         )
@@ -9,6 +9,9 @@ import pytest
 import yaml
 from pathlib import Path
 
+# Émetteur libyaml (C) quand disponible, comme le chargement de la configuration
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 @pytest.mark.integration
 class TestCampaignIntegration:
@@ -43,7 +46,7 @@ class TestCampaignIntegration:
         }
         
         with open(config_file, "w") as f:
-            yaml.dump(config, f)
+            yaml.dump(config, f, Dumper=_YAML_DUMPER)
         
         return str(config_file)
     
@@ -2,9 +2,56 @@
 Tests unitaires pour le wrapper iperf3.
 """
 
+import json
+import threading
 import pytest
 from unittest.mock import Mock, patch
-from src.tests.iperf_wrapper import IperfTest, IperfResult
+from src.tests import iperf_wrapper
+from src.tests.iperf_wrapper import IperfTest, IperfResult, merge_results, run_parallel_streams
+
+
+@pytest.fixture
+def iperf_test():
+    """IperfTest entre deux hôtes simulés, recréé pour chaque test."""
+    return IperfTest(Mock(), Mock(), port=5001)
+
+
+def _interval(end, bits_per_second):
+    """Ligne --json-stream d'un intervalle d'une seconde."""
+    return json.dumps({
+        "event": "interval",
+        "data": {"sum": {"end": end, "seconds": 1, "bits_per_second": bits_per_second}}
+    }) + "\n"
+
+
+class _FakeStreamProcess:
+    """Client iperf3 simulé dont la sortie est une suite de lignes --json-stream."""
+    
+    def __init__(self, lines, hang=False):
+        self.killed = threading.Event()
+        self.stdout = self._read(lines, hang)
+    
+    def _read(self, lines, hang):
+        yield from lines
+        if hang:
+            # Client bloqué : la sortie ne se termine qu'à l'arrêt forcé
+            self.killed.wait(timeout=5)
+    
+    def poll(self):
+        return 0 if self.killed.is_set() else None
+    
+    def kill(self):
+        self.killed.set()
+    
+    def wait(self):
+        return 0
+
+
+@pytest.fixture
+def streaming_test(iperf_test):
+    """IperfTest au serveur déjà démarré, prêt pour le mode --json-stream."""
+    iperf_test.server_process = Mock(poll=Mock(return_value=None))
+    return iperf_test
 
 
 class TestIperfTest:
@@ -21,52 +68,47 @@ class TestIperfTest:
         assert test.port == 5001
         assert test.server_process is None
     
-    def test_start_server_tcp(self):
+    def test_start_server_tcp(self, iperf_test):
         """Test du démarrage du serveur TCP."""
-        server = Mock()
-        client = Mock()
-        test = IperfTest(server, client)
-        
-        server.popen = Mock(return_value=Mock())
+        iperf_test.server_host.popen = Mock(return_value=Mock())
         
-        test.start_server(protocol="tcp")
+        iperf_test.start_server(protocol="tcp")
         
-        assert test.server_process is not None
-        server.popen.assert_called_once()
+        assert iperf_test.server_process is not None
+        iperf_test.server_host.popen.assert_called_once()
     
-    def test_start_server_udp(self):
+    def test_start_server_udp(self, iperf_test):
         """Test du démarrage du serveur UDP."""
-        server = Mock()
-        client = Mock()
-        test = IperfTest(server, client)
+        iperf_test.server_host.popen = Mock(return_value=Mock())
         
-        server.popen = Mock(return_value=Mock())
+        iperf_test.start_server(protocol="udp")
         
-        test.start_server(protocol="udp")
+        assert iperf_test.server_process is not None
+        # -u est une option client : iperf3 la refuse en mode serveur
+        assert "-u" not in iperf_test.server_host.popen.call_args.args[0]
+    
+    def test_start_server_idempotent(self, iperf_test):
+        """Test qu'un serveur déjà actif n'est pas relancé."""
+        iperf_test.server_host.popen = Mock(return_value=Mock(poll=Mock(return_value=None)))
+        
+        iperf_test.start_server(protocol="tcp")
+        iperf_test.start_server(protocol="udp")
         
-        assert test.server_process is not None
+        iperf_test.server_host.popen.assert_called_once()
     
-    def test_stop_server(self):
+    def test_stop_server(self, iperf_test):
         """Test de l'arrêt du serveur."""
-        server = Mock()
-        client = Mock()
-        test = IperfTest(server, client)
-        
         mock_process = Mock()
         mock_process.wait = Mock()
-        test.server_process = mock_process
+        iperf_test.server_process = mock_process
         
-        test.stop_server()
+        iperf_test.stop_server()
         
-        assert test.server_process is None
+        assert iperf_test.server_process is None
         mock_process.terminate.assert_called_once()
     
-    def test_parse_json_result_tcp(self):
+    def test_parse_json_result_tcp(self, iperf_test):
         """Test du parsing JSON pour TCP."""
-        server = Mock()
-        client = Mock()
-        test = IperfTest(server, client)
-        
         json_output = """
         {
             "end": {
@@ -83,18 +125,14 @@ class TestIperfTest:
         }
         """
         
-        result = test._parse_json_result(json_output, "tcp", 60)
+        result = iperf_test._parse_json_result(json_output, "tcp", 60)
         
         assert result.protocol == "tcp"
         assert result.throughput_mbps == 1000.0
         assert result.retransmissions == 5
     
-    def test_parse_json_result_udp(self):
+    def test_parse_json_result_udp(self, iperf_test):
         """Test du parsing JSON pour UDP."""
-        server = Mock()
-        client = Mock()
-        test = IperfTest(server, client)
-        
         json_output = """
         {
             "end": {
@@ -108,9 +146,189 @@ class TestIperfTest:
         }
         """
         
-        result = test._parse_json_result(json_output, "udp", 60)
+        result = iperf_test._parse_json_result(json_output, "udp", 60)
         
         assert result.protocol == "udp"
         assert result.throughput_mbps == 500.0
         assert result.packet_loss == 0.5
         assert result.jitter_ms == 2.5
+    
+    def test_parse_json_result_iperf_layout(self, iperf_test):
+        """Test du parsing de la section end dans la mise en forme d'iperf3."""
+        json_output = (
+            '{\n'
+            '\t"start":\t{\n\t\t"version":\t"iperf 3.16"\n\t},\n'
+            '\t"intervals":\t[{\n\t\t\t"sum":\t{\n'
+            '\t\t\t\t"start":\t0,\n\t\t\t\t"end":\t1,\n'
+            '\t\t\t\t"bits_per_second":\t1\n\t\t\t}\n\t\t}],\n'
+            '\t"end":\t{\n'
+            '\t\t"sum_sent":\t{\n\t\t\t"bytes":\t2000,\n\t\t\t"retransmits":\t3\n\t\t},\n'
+            '\t\t"sum_received":\t{\n\t\t\t"bits_per_second":\t250000000,\n\t\t\t"bytes":\t1000\n\t\t}\n'
+            '\t}\n'
+            '}\n'
+        )
+        
+        result = iperf_test._parse_json_result(json_output, "tcp", 10)
+        
+        assert result.throughput_mbps == 250.0
+        assert result.retransmissions == 3
+        assert result.bytes_sent == 2000
+        assert result.bytes_received == 1000
+    
+    @pytest.mark.parametrize("line, expected_mbps", [
+        ("[  5]   0.00-10.00  sec   119 MBytes  950 Kbits/sec  receiver", 0.95),
+        ("[  5]   0.00-10.00  sec   112 MBytes  94.1 Mbits/sec    0  sender", 94.1),
+        ("[  5]   0.00-10.00  sec  11.0 GBytes  9.42 Gbits/sec  receiver", 9420.0),
+    ])
+    def test_parse_text_result_units(self, iperf_test, line, expected_mbps):
+        """Test de la conversion des unités de débit de la sortie texte."""
+        output = "[  5]   0.00-1.00   sec  1.00 MBytes  8.39 Mbits/sec\n" + line + "\n"
+        
+        result = iperf_test._parse_text_result(output, "tcp", 10)
+        
+        # Le débit retenu est celui du résumé final (dernière ligne)
+        assert result.throughput_mbps == pytest.approx(expected_mbps)
+    
+    def test_parse_text_result_without_throughput(self, iperf_test):
+        """Test d'une sortie texte sans débit."""
+        result = iperf_test._parse_text_result("iperf3: error", "tcp", 10)
+        
+        assert result.throughput_mbps == 0.0
+    
+    def test_wait_for_server(self, iperf_test):
+        """Test de l'attente du port serveur, en écoute au troisième sondage."""
+        iperf_test.server_host.cmd = Mock(side_effect=["", "", "LISTEN 0 5 0.0.0.0:5001 0.0.0.0:*\n"])
+        
+        assert iperf_test._wait_for_server(timeout=1.0, poll_interval=0.01)
+        assert iperf_test.server_host.cmd.call_count == 3
+        assert "sport = :5001" in iperf_test.server_host.cmd.call_args.args[0]
+    
+    def test_wait_for_server_timeout(self, iperf_test):
+        """Test d'un serveur qui n'écoute jamais."""
+        iperf_test.server_host.cmd = Mock(return_value="")
+        
+        assert not iperf_test._wait_for_server(timeout=0.05, poll_interval=0.01)
+    
+    def test_merge_results(self):
+        """Test de l'agrégation de flux simultanés."""
+        results = [
+            IperfResult("udp", 10, 400.0, packet_loss=1.0, jitter_ms=0.5, bytes_sent=1000),
+            IperfResult("udp", 10, 600.0, packet_loss=4.0, jitter_ms=2.0, bytes_sent=3000),
+        ]
+        
+        merged = merge_results(results)
+        
+        assert merged.throughput_mbps == 1000.0
+        assert merged.packet_loss == 3.25
+        assert merged.jitter_ms == 2.0
+        assert merged.bytes_sent == 4000
+        assert merged.retransmissions is None
+    
+    def test_run_parallel_streams(self):
+        """Test de flux simultanés sur les ports base+i, aux débits additionnés."""
+        server = Mock()
+        server.popen = Mock(side_effect=lambda *args, **kwargs: Mock(poll=Mock(return_value=None)))
+        server.cmd = Mock(return_value="LISTEN 0 5 0.0.0.0:5001 0.0.0.0:*")
+        client = Mock()
+        
+        def client_popen(cmd, **kwargs):
+            # 100 Mbps sur 5001, 200 Mbps sur 5002, 300 Mbps sur 5003
+            port = int(cmd[cmd.index("-p") + 1])
+            end = {"sum_received": {"bits_per_second": (port - 5000) * 100e6, "bytes": 1000}}
+            output = json.dumps({"end": end}).encode()
+            return Mock(communicate=Mock(return_value=(output, b"")))
+        
+        client.popen = Mock(side_effect=client_popen)
+        iperf_tests = [IperfTest(server, client, port=5001 + i) for i in range(3)]
+        
+        results = run_parallel_streams(iperf_tests, "tcp", duration=10, iterations=2, delay=0)
+        
+        assert [r.throughput_mbps for r in results] == [600.0, 600.0]
+        assert [r.bytes_received for r in results] == [3000, 3000]
+        # Un serveur par port, démarré une seule fois pour toutes les itérations
+        assert [c.args[0][3] for c in server.popen.call_args_list] == ["5001", "5002", "5003"]
+        client_ports = sorted(c.args[0][c.args[0].index("-p") + 1] for c in client.popen.call_args_list)
+        assert client_ports == ["5001", "5001", "5002", "5002", "5003", "5003"]
+    
+    def test_run_parallel_streams_server_down(self):
+        """Test d'un serveur qui s'arrête aussitôt démarré."""
+        server = Mock()
+        server.popen = Mock(return_value=Mock(poll=Mock(return_value=1)))
+        server.cmd = Mock(return_value="")
+        client = Mock()
+        iperf_tests = [IperfTest(server, client, port=5001)]
+        
+        with patch.object(IperfTest, "_wait_for_server", return_value=False):
+            with pytest.raises(RuntimeError, match="port 5001"):
+                run_parallel_streams(iperf_tests, "tcp", duration=10, iterations=1, delay=0)
+        
+        client.popen.assert_not_called()
+    
+    def test_run_test_stream_aborts_when_min_throughput_unreachable(self, streaming_test):
+        """Test de l'arrêt anticipé quand le débit minimal devient inatteignable."""
+        # 1 Mbps pendant 1s puis au mieux 100 Mbps sur 9s : moins que 95 Mbps x 10s
+        process = _FakeStreamProcess([_interval(1, 1e6), _interval(2, 1e6)])
+        streaming_test.client_host.popen = Mock(return_value=process)
+        
+        result = streaming_test.run_test(
+            "tcp", duration=10, min_throughput_mbps=95, link_capacity_mbps=100
+        )
+        
+        cmd = streaming_test.client_host.popen.call_args.args[0]
+        assert "--json-stream" in cmd and "--forceflush" in cmd
+        assert result.duration == 1
+        assert result.throughput_mbps == 1.0
+        assert process.killed.is_set()
+    
+    def test_run_test_stream_uses_end_summary(self, streaming_test):
+        """Test d'un test complet en mode --json-stream."""
+        end = {
+            "event": "end",
+            "data": {
+                "sum_sent": {"bytes": 2000, "retransmits": 1},
+                "sum_received": {"bits_per_second": 90e6, "bytes": 1000}
+            }
+        }
+        lines = [_interval(i, 90e6) for i in range(1, 4)] + ["\n", json.dumps(end) + "\n"]
+        streaming_test.client_host.popen = Mock(return_value=_FakeStreamProcess(lines))
+        
+        result = streaming_test.run_test(
+            "tcp", duration=3, min_throughput_mbps=10, link_capacity_mbps=100
+        )
+        
+        assert result.throughput_mbps == 90.0
+        assert result.retransmissions == 1
+        assert result.duration == 3
+    
+    def test_run_test_stream_error_event(self, streaming_test):
+        """Test d'une erreur signalée par iperf3."""
+        error = json.dumps({"event": "error", "data": "unable to connect to server"}) + "\n"
+        streaming_test.client_host.popen = Mock(return_value=_FakeStreamProcess([error]))
+        
+        with pytest.raises(RuntimeError, match="unable to connect"):
+            streaming_test.run_test(
+                "tcp", duration=10, min_throughput_mbps=10, link_capacity_mbps=100
+            )
+    
+    def test_run_test_stream_without_end(self, streaming_test):
+        """Test d'une sortie interrompue avant le résumé final."""
+        process = _FakeStreamProcess([_interval(1, 90e6)])
+        streaming_test.client_host.popen = Mock(return_value=process)
+        
+        with pytest.raises(RuntimeError, match="sans résumé final"):
+            streaming_test.run_test(
+                "tcp", duration=10, min_throughput_mbps=10, link_capacity_mbps=100
+            )
+    
+    def test_run_test_stream_watchdog(self, streaming_test, monkeypatch):
+        """Test de l'arrêt forcé d'un client bloqué."""
+        monkeypatch.setattr(iperf_wrapper, "_CLIENT_TIMEOUT_MARGIN", 0.05)
+        process = _FakeStreamProcess([_interval(1, 90e6)], hang=True)
+        streaming_test.client_host.popen = Mock(return_value=process)
+        
+        with pytest.raises(RuntimeError, match="sans fin de test"):
+            streaming_test.run_test(
+                "tcp", duration=1, min_throughput_mbps=10, link_capacity_mbps=100
+            )
+        
+        assert process.killed.is_set()
@@ -0,0 +1,161 @@
+"""
+Tests unitaires pour le test de latence.
+"""
+
+import socket
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.tests import latency_test
+from src.tests.latency_test import LatencyTest, _ECHO_TS, _CLIENT_TS, _TIMESPEC, _kernel_rx_ns
+
+# Valeur Linux (x86/ARM) de SO_TIMESTAMPNS, pour les tests de décodage
+_LINUX_SO_TIMESTAMPNS = 35
+
+
+def _free_udp_port():
+    """Port UDP libre sur la boucle locale."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _DelayedEcho:
+    """Serveur d'écho UDP local qui répond après un délai (ou jamais)."""
+
+    def __init__(self, port, delay=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", port))
+        self.sock.settimeout(0.05)
+        self.delay = delay
+        self._stop = threading.Event()
+        self._timers = []
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            if self.delay is None:
+                continue
+            reply = _ECHO_TS.pack(_CLIENT_TS.unpack_from(data, 0)[0], time.time_ns())
+            timer = threading.Timer(self.delay, self.sock.sendto, (reply, addr))
+            self._timers.append(timer)
+            timer.start()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        for timer in self._timers:
+            timer.join()
+        self.sock.close()
+
+
+@pytest.fixture
+def loopback_test():
+    """LatencyTest entre deux hôtes simulés, joignables sur 127.0.0.1."""
+    server = Mock()
+    server.IP.return_value = "127.0.0.1"
+    test = LatencyTest(server, Mock(), port=_free_udp_port())
+    yield test
+    test.stop_server()
+
+
+@pytest.fixture
+def delayed_echo(loopback_test):
+    """Remplace le serveur d'écho du test par un serveur local retardé."""
+    echoes = []
+
+    def make(delay=None):
+        echo = _DelayedEcho(loopback_test.port, delay)
+        echoes.append(echo)
+        # run_test ne démarre pas son propre serveur
+        loopback_test.server_transport = Mock()
+        return echo
+
+    yield make
+    loopback_test.server_transport = None
+    for echo in echoes:
+        echo.close()
+
+
+class TestKernelRxNs:
+    """Tests du décodage de l'horodatage noyau."""
+
+    @pytest.fixture(autouse=True)
+    def so_timestampns(self, monkeypatch):
+        monkeypatch.setattr(latency_test, "_SO_TIMESTAMPNS", _LINUX_SO_TIMESTAMPNS)
+
+    def test_valid_timespec(self):
+        """Test d'un message de contrôle timespec valide."""
+        ancdata = [(socket.SOL_SOCKET, _LINUX_SO_TIMESTAMPNS, _TIMESPEC.pack(12, 345))]
+
+        assert _kernel_rx_ns(ancdata) == 12_000_000_345
+
+    def test_wrong_level_or_type(self):
+        """Test de messages de contrôle d'un autre niveau ou d'un autre type."""
+        data = _TIMESPEC.pack(12, 345)
+        ancdata = [
+            (socket.IPPROTO_IP, _LINUX_SO_TIMESTAMPNS, data),
+            (socket.SOL_SOCKET, _LINUX_SO_TIMESTAMPNS + 1, data),
+        ]
+
+        assert _kernel_rx_ns(ancdata) is None
+
+    def test_short_data(self):
+        """Test d'un timespec tronqué."""
+        ancdata = [(socket.SOL_SOCKET, _LINUX_SO_TIMESTAMPNS, _TIMESPEC.pack(12, 345)[:8])]
+
+        assert _kernel_rx_ns(ancdata) is None
+
+
+class TestLatencyTest:
+    """Tests de run_test sur la boucle locale."""
+
+    def test_run_test_paced(self, loopback_test):
+        """Test de l'émission cadencée contre le serveur d'écho."""
+        result = loopback_test.run_test(duration=0.5, interval=0.1)
+
+        # Grille fixe : un paquet à t = 0, 0.1, ..., 0.4
+        assert 4 <= result.packets_sent <= 6
+        assert result.packets_received == result.packets_sent
+        assert result.packet_loss_percent == 0.0
+        assert len(result.rtt_samples) == result.packets_sent
+
+    def test_run_test_counts_late_replies(self, loopback_test, delayed_echo):
+        """Test que les réponses arrivées après la fin de l'émission sont comptées."""
+        delayed_echo(delay=0.3)
+
+        result = loopback_test.run_test(duration=0.1, interval=0.05)
+
+        assert result.packets_sent >= 1
+        assert result.packets_received == result.packets_sent
+        # Chaque réponse porte son propre RTT, retard du serveur compris
+        assert result.rtt_min_ms >= 300
+
+    def test_run_test_grace_period(self, loopback_test, delayed_echo):
+        """Test du délai de grâce de 2 s quand aucune réponse n'arrive."""
+        delayed_echo(delay=None)
+
+        start = time.monotonic()
+        result = loopback_test.run_test(duration=0.1, interval=0.05)
+        elapsed = time.monotonic() - start
+
+        assert 2.0 <= elapsed < 3.0
+        assert result.packets_received == 0
+        assert result.packet_loss_percent == 100.0
+
+    def test_run_test_stop_event(self, loopback_test):
+        """Test de l'arrêt anticipé par stop_event."""
+        stop_event = threading.Event()
+        threading.Timer(0.2, stop_event.set).start()
+
+        start = time.monotonic()
+        result = loopback_test.run_test(duration=30, interval=0.05, stop_event=stop_event)
+
+        assert time.monotonic() - start < 2.0
+        assert result.packets_sent >= 1
@@ -0,0 +1,119 @@
+"""
+Tests unitaires pour la sonde de monitoring.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.monitoring import probe as probe_module
+from src.monitoring.probe import NetworkProbe
+
+
+class _UdpEcho:
+    """Cible UDP locale qui renvoie chaque datagramme reçu (ou reste muette)."""
+
+    def __init__(self, ip, reply=True):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((ip, 0))
+        self.sock.settimeout(0.05)
+        self.address = self.sock.getsockname()
+        self.reply = reply
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            if self.reply:
+                self.sock.sendto(data, addr)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.sock.close()
+
+
+@pytest.fixture
+def udp_target():
+    """Fabrique de cibles UDP locales, fermées en fin de test."""
+    targets = []
+
+    def make(ip="127.0.0.1", reply=True):
+        target = _UdpEcho(ip, reply)
+        targets.append(target)
+        return target
+
+    yield make
+    for target in targets:
+        target.close()
+
+
+@pytest.fixture
+def probe(monkeypatch):
+    """Sonde aux métriques et au serveur HTTP Prometheus simulés."""
+    # Les métriques Prometheus s'enregistrent dans un registre global : une
+    # seconde sonde réelle dans le même processus y serait refusée
+    monkeypatch.setattr(probe_module, "Gauge", Mock())
+    monkeypatch.setattr(probe_module, "Counter", Mock())
+    monkeypatch.setattr(probe_module, "start_http_server", Mock())
+    monkeypatch.setattr(probe_module, "logger", Mock())
+    probe = NetworkProbe(hostname="h1", port=0)
+    yield probe
+    probe.stop()
+    if probe._async_sock is not None:
+        probe._async_sock.close()
+
+
+class TestNetworkProbe:
+    """Tests pour la classe NetworkProbe."""
+
+    def test_probe_targets_async_all_reply(self, probe, udp_target):
+        """Test d'un cycle de sondage où toutes les cibles répondent."""
+        targets = [udp_target("127.0.0.1").address, udp_target("127.0.0.2").address]
+
+        latencies = asyncio.run(probe._probe_targets_async(targets, timeout=1.0))
+
+        assert set(latencies) == {"127.0.0.1", "127.0.0.2"}
+        assert all(latency >= 0 for latency in latencies.values())
+        probe_module.logger.warning.assert_not_called()
+
+    def test_probe_targets_async_silent_target(self, probe, udp_target):
+        """Test d'une cible muette : résultat partiel et avertissement."""
+        targets = [udp_target("127.0.0.1").address, udp_target("127.0.0.2", reply=False).address]
+
+        start = time.monotonic()
+        latencies = asyncio.run(probe._probe_targets_async(targets, timeout=0.2))
+
+        assert time.monotonic() - start < 1.0
+        assert list(latencies) == ["127.0.0.1"]
+        probe_module.logger.warning.assert_called_once_with("Timeout lors de l'envoi du message de test à 127.0.0.2")
+
+    def test_stop_joins_promptly(self, probe, udp_target):
+        """Test que stop() interrompt la collecte sans attendre la fin de l'intervalle."""
+        probe.test_targets = [udp_target("127.0.0.1").address]
+        probe.start()
+        thread = probe.thread
+
+        start = time.monotonic()
+        probe.stop()
+
+        assert time.monotonic() - start < 1.0
+        assert not thread.is_alive()
+        assert probe.loop.is_closed()
+
+    def test_stop_after_loop_closed(self, probe):
+        """Test de l'arrêt quand la boucle de collecte est déjà fermée."""
+        probe.loop = asyncio.new_event_loop()
+        probe.loop.close()
+        probe._collect_task = Mock()
+
+        probe.stop()
+
+        assert probe._collect_task is None
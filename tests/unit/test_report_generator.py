@@ -0,0 +1,150 @@
+"""
+Tests unitaires pour le générateur de rapports.
+"""
+
+import pytest
+from src.monitoring import report_generator
+from src.monitoring.report_generator import ReportGenerator
+from src.tests.iperf_wrapper import IperfResult
+from src.tests.latency_test import LatencyResult
+from src.tests import run_test_campaign
+
+
+def _latency_result(rtt_samples=(1.0, 2.0, 1.5)):
+    """Résultat de latence minimal."""
+    return LatencyResult(
+        rtt_min_ms=1.0,
+        rtt_max_ms=2.0,
+        rtt_mean_ms=1.5,
+        rtt_std_ms=0.5,
+        jitter_ms=0.5,
+        packet_loss_percent=0.0,
+        packets_sent=3,
+        packets_received=3,
+        rtt_samples=list(rtt_samples),
+    )
+
+
+def _campaign_result(**overrides):
+    """Résultat de campagne avec un test de chaque type."""
+    fields = dict(
+        campaign_id="20260101_120000",
+        start_time="2026-01-01T12:00:00",
+        end_time="2026-01-01T12:01:00",
+        duration_seconds=60.0,
+        iperf_results=[
+            IperfResult("tcp", 10, 940.0, retransmissions=3, bytes_sent=2000, bytes_received=1000),
+            IperfResult("udp", 10, 95.0, packet_loss=0.5, jitter_ms=0.2),
+        ],
+        latency_results=[_latency_result()],
+        thresholds={"max_latency_ms": 50},
+        passed=True,
+        errors=[],
+    )
+    fields.update(overrides)
+    return run_test_campaign.TestCampaignResult(**fields)
+
+
+@pytest.fixture
+def generator():
+    """Générateur de rapports, dont le pool de rendu est arrêté en fin de test."""
+    with ReportGenerator() as generator:
+        yield generator
+
+
+class TestReportGenerator:
+    """Tests pour la classe ReportGenerator."""
+
+    def test_generate_two_html_reports(self, generator, tmp_path):
+        """Test de deux rapports HTML successifs avec le même générateur."""
+        pools = []
+        for name in ("first", "second"):
+            output_dir = tmp_path / name
+            output_dir.mkdir()
+            html_path = output_dir / f"campaign_{name}.html"
+
+            generator.generate_html_report(_campaign_result(campaign_id=name), html_path)
+            pools.append(generator._pool)
+
+            html = html_path.read_text(encoding="utf-8")
+            for chart in ("latency_chart.png", "throughput_chart.png"):
+                assert (output_dir / "graphs" / chart).stat().st_size > 0
+                assert f'src="graphs/{chart}"' in html
+
+        # Le pool, créé au premier rapport, est réutilisé puis arrêté
+        assert pools[0] is not None and pools[1] is pools[0]
+        generator.close()
+        assert generator._pool is None
+
+    def test_generate_parquet(self, generator, tmp_path):
+        """Test de l'export Parquet relu avec pyarrow."""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        # Points supplémentaires dans le nom : seul le suffixe .parquet est remplacé
+        output_path = tmp_path / "campaign_v1.2.parquet"
+
+        written = generator.generate_parquet(_campaign_result(), output_path)
+
+        latency_path = tmp_path / "campaign_v1.2.latency.parquet"
+        iperf_path = tmp_path / "campaign_v1.2.iperf.parquet"
+        assert written == [latency_path, iperf_path]
+
+        latency = pq.read_table(latency_path)
+        assert latency.schema.names == [
+            "campaign_id",
+            "rtt_min_ms",
+            "rtt_max_ms",
+            "rtt_mean_ms",
+            "rtt_std_ms",
+            "jitter_ms",
+            "packet_loss_percent",
+            "packets_sent",
+            "packets_received",
+            "rtt_samples",
+        ]
+        assert latency.schema.field("campaign_id").type == pa.dictionary(pa.int32(), pa.string())
+        assert latency.schema.field("rtt_samples").type == pa.list_(pa.float64())
+        assert latency.schema.field("packets_sent").type == pa.int64()
+        assert latency.column("campaign_id").to_pylist() == ["20260101_120000"]
+        assert latency.column("rtt_samples").to_pylist() == [[1.0, 2.0, 1.5]]
+
+        iperf = pq.read_table(iperf_path)
+        assert iperf.schema.names == [
+            "campaign_id",
+            "protocol",
+            "duration",
+            "throughput_mbps",
+            "retransmissions",
+            "packet_loss",
+            "jitter_ms",
+            "bytes_sent",
+            "bytes_received",
+        ]
+        assert iperf.schema.field("protocol").type == pa.dictionary(pa.int32(), pa.string())
+        assert iperf.schema.field("retransmissions").type == pa.int64()
+        # Valeurs absentes selon le protocole : colonnes nullables
+        assert iperf.column("retransmissions").to_pylist() == [3, None]
+        assert iperf.column("packet_loss").to_pylist() == [None, 0.5]
+        assert iperf.column("throughput_mbps").to_pylist() == [940.0, 95.0]
+
+    def test_html_content_escapes_results(self, generator):
+        """Test de l'échappement des chaînes issues des résultats."""
+        result = _campaign_result(campaign_id="<b>20260101</b>", passed=False, errors=["Débit <b>trop</b> faible"])
+
+        html = generator._generate_html_content(result, None, None)
+
+        assert "<b>" not in html
+        assert "&lt;b&gt;20260101&lt;/b&gt;" in html
+        assert "<li>Débit &lt;b&gt;trop&lt;/b&gt; faible</li>" in html
+
+    def test_latency_chart_without_rtt_samples(self, tmp_path):
+        """Test du graphique de latence quand le premier test n'a aucun échantillon."""
+        results = [_latency_result(rtt_samples=()), _latency_result()]
+
+        chart = report_generator._render_latency_chart(results, tmp_path)
+
+        assert chart == "graphs/latency_chart.png"
+        assert (tmp_path / "latency_chart.png").stat().st_size > 0
+        # Le panneau de distribution est retiré, les trois autres restent
+        titles = [ax.get_title() for ax in report_generator._get_figure().axes]
+        assert titles == ["RTT Moyen, Min, Max", "Jitter", "Perte de Paquets"]
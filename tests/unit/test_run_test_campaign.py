@@ -0,0 +1,185 @@
+"""
+Tests unitaires pour l'orchestrateur de campagnes.
+"""
+
+import math
+import sys
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.tests import run_test_campaign
+from src.tests.latency_test import LatencyResult
+
+
+def _latency_result():
+    """Résultat de latence conforme aux seuils par défaut."""
+    return LatencyResult(
+        rtt_min_ms=1.0,
+        rtt_max_ms=2.0,
+        rtt_mean_ms=1.5,
+        rtt_std_ms=0.5,
+        jitter_ms=0.5,
+        packet_loss_percent=0.0,
+        packets_sent=2,
+        packets_received=2,
+        rtt_samples=[1.0, 2.0],
+    )
+
+
+class _FakeLatencyTest:
+    """LatencyTest simulé : mesure jusqu'à la fin de duration ou jusqu'à stop_event."""
+
+    instances = []
+    created = threading.Event()
+    error = None
+
+    def __init__(self, server_host, client_host, port=5003):
+        self.started = threading.Event()
+        self.finished = threading.Event()
+        self.duration = None
+        self.stopped_by_event = False
+        _FakeLatencyTest.instances.append(self)
+        _FakeLatencyTest.created.set()
+
+    def run_test(self, duration=60, interval=1.0, stop_event=None):
+        self.duration = duration
+        self.started.set()
+        try:
+            if self.error is not None:
+                raise self.error
+            stop_event.wait(None if math.isinf(duration) else duration)
+            self.stopped_by_event = stop_event.is_set()
+            return _latency_result()
+        finally:
+            self.finished.set()
+
+    def stop_server(self):
+        pass
+
+
+@pytest.fixture
+def campaign(tmp_path, monkeypatch):
+    """Campagne sur un réseau simulé, latence mesurée pendant les tests iperf3."""
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("tests:\n" "  duration_seconds: 0.01\n" "  latency_during_iperf: true\n")
+    # Pas de fichier de log ni de rapport pendant les tests
+    monkeypatch.setattr(run_test_campaign.logger, "add", Mock())
+    monkeypatch.setattr(run_test_campaign.TestCampaign, "_generate_reports", Mock())
+
+    _FakeLatencyTest.instances = []
+    _FakeLatencyTest.created = threading.Event()
+    _FakeLatencyTest.error = None
+    monkeypatch.setattr(run_test_campaign, "LatencyTest", _FakeLatencyTest)
+
+    campaign = run_test_campaign.TestCampaign(config_path=str(config_file))
+    simulator = Mock()
+    simulator.get_all_hosts.return_value = [Mock(), Mock()]
+
+    def start_network():
+        campaign.simulator = simulator
+
+    campaign.start_network = start_network
+    return campaign
+
+
+class TestLatencyDuringIperf:
+    """Tests de la mesure de latence en arrière-plan des tests iperf3."""
+
+    def test_latency_runs_until_iperf_ends(self, campaign):
+        """Test que la latence est mesurée jusqu'à la fin des tests iperf3."""
+        latency_running = []
+
+        def run_iperf_tests():
+            assert _FakeLatencyTest.created.wait(timeout=1)
+            latency = _FakeLatencyTest.instances[0]
+            assert latency.started.wait(timeout=1)
+            # Plus longtemps que duration_seconds (0.01s)
+            latency.finished.wait(timeout=0.2)
+            latency_running.append(not latency.finished.is_set())
+            return []
+
+        campaign.run_iperf_tests = run_iperf_tests
+
+        result = campaign.run()
+
+        latency = _FakeLatencyTest.instances[0]
+        assert latency_running == [True]
+        assert latency.duration == math.inf
+        assert latency.stopped_by_event
+        assert result.latency_results == [_latency_result()]
+        assert result.errors == []
+
+    def test_latency_error_is_reported(self, campaign):
+        """Test qu'une erreur du thread de latence est reportée dans la campagne."""
+        _FakeLatencyTest.error = RuntimeError("socket fermé")
+        campaign.run_iperf_tests = Mock(return_value=[])
+
+        result = campaign.run()
+
+        assert result.latency_results == []
+        assert result.errors == ["Erreur lors des tests de latence: socket fermé"]
+        assert not result.passed
+
+
+class TestNetworkReadiness:
+    """Tests de l'attente du réseau au démarrage."""
+
+    @staticmethod
+    def _simulator(source):
+        """Simulateur dont le premier hôte est source et le second répond sur 10.0.0.2."""
+        target = Mock()
+        target.IP.return_value = "10.0.0.2"
+        simulator = Mock()
+        simulator.get_all_hosts.return_value = [source, target]
+        return simulator
+
+    def test_probe_pair(self):
+        """Test de l'interprétation du code de retour de ping."""
+        source = Mock()
+        source.cmd.return_value = "0\n"
+
+        assert run_test_campaign.TestCampaign._probe_pair(source, "10.0.0.2")
+        assert "ping -c1 -W1 10.0.0.2" in source.cmd.call_args.args[0]
+
+        source.cmd.return_value = "1\n"
+        assert not run_test_campaign.TestCampaign._probe_pair(source, "10.0.0.2")
+
+    def test_wait_for_network_ready_retries(self, campaign):
+        """Test d'un réseau qui répond à la deuxième tentative."""
+        source = Mock()
+        source.cmd.side_effect = ["1\n", "0\n"]
+        campaign.simulator = self._simulator(source)
+
+        assert campaign._wait_for_network_ready(timeout=1.0, interval=0.01)
+        assert source.cmd.call_count == 2
+
+    def test_wait_for_network_ready_timeout(self, campaign):
+        """Test d'un réseau muet : abandon après le délai, puis avertissement."""
+        source = Mock()
+        source.cmd.return_value = "1\n"
+        campaign.simulator = self._simulator(source)
+
+        start = time.monotonic()
+        assert not campaign._wait_for_network_ready(interval=0.1)
+        elapsed = time.monotonic() - start
+
+        # Délai par défaut de 3 s
+        assert 3.0 <= elapsed < 4.0
+        assert source.cmd.call_count > 1
+
+    def test_start_network_warns_when_not_ready(self, campaign, monkeypatch):
+        """Test que la campagne se poursuit avec un avertissement si le réseau ne répond pas."""
+        simulator = self._simulator(Mock())
+        network_simulator = Mock()
+        network_simulator.NetworkSimulator.return_value = simulator
+        monkeypatch.setitem(sys.modules, "src.simulator.network_simulator", network_simulator)
+        monkeypatch.setattr(campaign, "_wait_for_network_ready", Mock(return_value=False))
+        logger = Mock()
+        monkeypatch.setattr(run_test_campaign, "logger", logger)
+
+        run_test_campaign.TestCampaign.start_network(campaign)
+
+        simulator.start.assert_called_once()
+        logger.warning.assert_called_once_with("Le réseau ne répond pas encore, poursuite de la campagne")
+        simulator.ping_all.assert_not_called()
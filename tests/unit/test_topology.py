@@ -2,11 +2,49 @@
 Tests unitaires pour le module topology.
 """
 
+import sys
+import types
 import pytest
 from unittest.mock import Mock, MagicMock
 from src.simulator.topology import create_topology, load_topology_from_config
 
 
+@pytest.fixture
+def mock_net(monkeypatch):
+    """Réseau Containernet simulé, avec un switch et des hôtes Docker nommés h1..h4."""
+    # create_topology importe mininet.log et mininet.link à l'appel : modules
+    # factices pour que les tests tournent sans Mininet installé
+    mininet = types.ModuleType("mininet")
+    mininet_log = types.ModuleType("mininet.log")
+    mininet_log.info = Mock()
+    mininet_link = types.ModuleType("mininet.link")
+    mininet_link.TCLink = Mock()
+    mininet.log = mininet_log
+    mininet.link = mininet_link
+    monkeypatch.setitem(sys.modules, "mininet", mininet)
+    monkeypatch.setitem(sys.modules, "mininet.log", mininet_log)
+    monkeypatch.setitem(sys.modules, "mininet.link", mininet_link)
+    
+    net = Mock()
+    net.hosts = []
+    net.addSwitch = Mock(return_value=Mock())
+    
+    hosts = {}
+    for i in range(4):
+        host = Mock()
+        host.name = f"h{i+1}"
+        hosts[host.name] = host
+    
+    def add_docker(name, **params):
+        # Ajout en tête : simule des créations parallèles terminées dans le désordre
+        net.hosts.insert(0, hosts[name])
+        return hosts[name]
+    
+    net.addDocker = Mock(side_effect=add_docker)
+    
+    return net
+
+
 class TestTopology:
     """Tests pour les fonctions de topologie."""
     
@@ -27,42 +65,49 @@ network:
         assert config["hosts"] == 4
         assert config["latency_ms"] == 10
     
+    def test_load_topology_from_config_reloads_modified_file(self, tmp_path):
+        """Test de l'invalidation du cache quand le fichier change."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("network:\n  hosts: 4\n")
+        
+        config = load_topology_from_config(str(config_file))
+        config["hosts"] = 99  # Ne doit pas polluer le cache
+        assert load_topology_from_config(str(config_file))["hosts"] == 4
+        
+        config_file.write_text("network:\n  hosts: 12\n")
+        assert load_topology_from_config(str(config_file))["hosts"] == 12
+    
+    def test_load_topology_from_config_keeps_yaml_types(self, tmp_path):
+        """Test que les clés non textuelles du YAML survivent au cache."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("network:\n  ports: {5001: tcp}\n  on: yes\n")
+        
+        for _ in range(2):
+            config = load_topology_from_config(str(config_file))
+            assert config["ports"] == {5001: "tcp"}
+            assert config[True] is True
+    
     def test_load_topology_from_config_not_found(self):
         """Test avec fichier de configuration inexistant."""
         with pytest.raises(FileNotFoundError):
             load_topology_from_config("nonexistent.yaml")
     
-    def test_create_topology_star(self):
+    def test_create_topology_star(self, mock_net):
         """Test de création d'une topologie en étoile."""
-        net = Mock()
-        net.addController = Mock()
-        net.addSwitch = Mock(return_value=Mock())
-        net.addDocker = Mock(return_value=Mock())
-        net.addLink = Mock()
-        
-        switch = Mock()
-        net.addSwitch.return_value = switch
-        
-        hosts = [Mock() for _ in range(4)]
-        for i, host in enumerate(hosts):
-            host.name = f"h{i+1}"
-            net.addDocker.return_value = host
-        
         create_topology(
-            net,
+            mock_net,
             topology_type="star",
             hosts=4,
             latency_ms=10,
             packet_loss=0.1
         )
         
-        assert net.addController.called
-        assert net.addSwitch.called
-        assert net.addDocker.call_count == 4
+        assert mock_net.addController.called
+        assert mock_net.addSwitch.called
+        assert mock_net.addDocker.call_count == 4
+        assert [host.name for host in mock_net.hosts] == ["h1", "h2", "h3", "h4"]
     
-    def test_create_topology_invalid(self):
+    def test_create_topology_invalid(self, mock_net):
         """Test avec un type de topologie invalide."""
-        net = Mock()
-        
         with pytest.raises(ValueError):
-            create_topology(net, topology_type="invalid")
+            create_topology(mock_net, topology_type="invalid")